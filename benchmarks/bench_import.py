@@ -0,0 +1,45 @@
+"""Benchmark of the import time of opengever.apiclient.
+
+Every import is measured in a fresh interpreter, because imports are cached
+per process. The interpreter startup time is measured separately and
+subtracted.
+
+Usage: python benchmarks/bench_import.py [--repeat N]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+STATEMENTS = {
+    'package': 'import opengever.apiclient',
+    'client': 'from opengever.apiclient import GEVERClient',
+}
+
+
+def measure(statement, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, '-c', statement])
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = measure('pass', args.repeat)
+    results = {f'{name}_import_seconds': max(0.0, measure(statement, args.repeat) - baseline)
+               for name, statement in STATEMENTS.items()}
+    results['interpreter_startup_seconds'] = baseline
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark of the JSON codecs decoding GEVER responses.
+
+Compares the decoding throughput of the installed codecs (see
+opengever.apiclient.jsoncodec) and, when ijson is installed, the incremental
+decoding of listing items. The payloads are synthetic @listing and @navigation
+responses shaped like the ones of GEVER; recorded responses can be passed as
+additional JSON files.
+
+Usage: python benchmarks/bench_json.py [--items N] [--iterations N] [payload.json ...]
+"""
+from io import BytesIO
+from pathlib import Path
+import argparse
+import json
+import time
+
+from opengever.apiclient.jsoncodec import CODECS
+
+
+BASE_URL = 'http://localhost:8080/fd/ordnungssystem/fuehrung/vertraege-und-vereinbarungen'
+
+
+def listing_payload(items, base_url=BASE_URL):
+    return {
+        '@id': f'{base_url}/dossier-1/@listing',
+        'b_size': items,
+        'b_start': 0,
+        'items_total': items,
+        'items': [{
+            '@id': f'{base_url}/dossier-1/document-{index}',
+            '@type': 'opengever.document.document',
+            'UID': f'{index:032x}',
+            'title': f'Vertragsentwurf {index} für die kantonale Finanzverwaltung',
+            'created': '2016-08-31T14:07:33+00:00',
+            'modified': '2016-08-31T16:05:33+00:00',
+            'filename': f'Vertragsentwurf {index}.docx',
+            'file_extension': '.docx',
+            'filesize': 27413 + index,
+            'checked_out': '',
+            'document_type': 'contract',
+            'reference': f'Client1 1.1 / 1 / {index}',
+            'review_state': 'document-state-draft',
+            'keywords': ['Wichtig', 'Vertrag'],
+            'bumblebee_checksum': f'{index:064x}',
+            'is_folderish': False,
+        } for index in range(items)],
+    }
+
+
+def navigation_payload(items, base_url=BASE_URL):
+    def node(path, depth):
+        return {
+            '@type': 'opengever.repository.repositoryfolder',
+            'uid': path.replace('/', '').rjust(32, '0'),
+            'url': f'{base_url}{path}',
+            'text': f'Ordnungsposition {path}',
+            'description': '',
+            'active': True,
+            'nodes': [node(f'{path}/{index}', depth - 1)
+                      for index in range(10)] if depth else [],
+        }
+    depth = 1
+    while 10 ** (depth + 1) < items:
+        depth += 1
+    return {'@id': f'{base_url}/@navigation', 'tree': [node('', depth)]}
+
+
+def decode_incremental(data):
+    import ijson
+    return sum(1 for _ in ijson.items(BytesIO(data), 'items.item', use_float=True))
+
+
+def measure(function, data, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function(data)
+    return len(data) * iterations / (time.perf_counter() - start) / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('payloads', nargs='*', type=Path)
+    args = parser.parse_args()
+
+    payloads = {
+        'listing': json.dumps(listing_payload(args.items)).encode('utf-8'),
+        'navigation': json.dumps(navigation_payload(args.items)).encode('utf-8'),
+    }
+    for path in args.payloads:
+        payloads[path.name] = path.read_bytes()
+
+    results = {}
+    for payload_name, data in payloads.items():
+        result = {'bytes': len(data)}
+        for codec_name, codec in CODECS.items():
+            try:
+                codec = codec()
+            except ImportError:
+                continue
+            result[f'{codec_name}_mb_per_second'] = measure(codec.loads, data, args.iterations)
+
+        try:
+            import ijson  # noqa
+        except ImportError:
+            pass
+        else:
+            if b'"items"' in data:
+                result['ijson_items_mb_per_second'] = measure(
+                    decode_incremental, data, args.iterations)
+        results[payload_name] = result
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
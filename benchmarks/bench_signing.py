@@ -0,0 +1,56 @@
+"""Micro-benchmark of the JWT grant signing.
+
+Compares signing the grant with the PEM private key of the service key, which
+is parsed on every call, with signing it with the private key object cached by
+the KeyRegistry.
+
+Usage: python benchmarks/bench_signing.py [--iterations N]
+"""
+from pathlib import Path
+import argparse
+import json
+import time
+
+import jwt
+
+from opengever.apiclient.keys import KeyRegistry
+
+
+KEYS_DIR = Path(__file__).parent.parent / 'opengever' / 'apiclient' / 'tests' / 'keys'
+
+
+def measure(function, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    KeyRegistry.clear()
+    KeyRegistry.load_keys(str(KEYS_DIR))
+    service_key = KeyRegistry.get_key_for('http://gever.test/mandant/')
+    claim_set = {'iss': service_key['client_id'], 'sub': 'john.doe',
+                 'aud': service_key['token_uri'], 'iat': 0, 'exp': 3600}
+
+    results = {
+        'pem_signatures_per_second': measure(
+            lambda: jwt.encode(claim_set, service_key['private_key'], algorithm='RS256'),
+            args.iterations),
+        'cached_key_signatures_per_second': measure(
+            lambda: jwt.encode(claim_set,
+                               KeyRegistry.get_signing_key_for('http://gever.test/mandant/'),
+                               algorithm='RS256'),
+            args.iterations),
+    }
+    results['speedup'] = (results['cached_key_signatures_per_second']
+                          / results['pem_signatures_per_second'])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
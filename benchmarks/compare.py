@@ -0,0 +1,55 @@
+"""Compare two result files of benchmarks/run.py.
+
+Prints the change of every benchmark and marks the ones which got worse by more
+than the threshold. Exits with status 1 when there are such regressions.
+
+Usage: python benchmarks/compare.py baseline.json results.json [--threshold PERCENT]
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(baseline, current, threshold):
+    """Returns rows of name, baseline value, current value, change in percent
+    (positive is better) and whether it is a regression.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        old = baseline['results'][name]['value']
+        new = result['value']
+        change = (new - old) / old * 100 if old else 0.0
+        if not result.get('higher_is_better', True):
+            change = 0.0 - change
+        rows.append((name, old, new, result.get('unit', ''), change, change < -threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Regression threshold in percent (default: 10).')
+    args = parser.parse_args()
+
+    baseline, current = load(args.baseline), load(args.current)
+    rows = compare(baseline, current, args.threshold)
+
+    print(f'{baseline.get("commit")} -> {current.get("commit")}')
+    for name, old, new, unit, change, regression in rows:
+        marker = '  REGRESSION' if regression else ''
+        print(f'{name:35} {old:14.4g} {new:14.4g} {unit:10} {change:+7.1f}%{marker}')
+
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Benchmark suite measuring the client-side overhead of opengever.apiclient.
+
+The benchmarks run against the in-process stub server (see stubserver), so the
+results reflect the client and not GEVER. The results are written as JSON,
+together with the commit and Python version, and can be compared across
+commits with benchmarks/compare.py.
+
+Usage: python benchmarks/run.py [--items N] [--output results.json] [benchmark ...]
+"""
+from io import BytesIO
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from bench_import import measure as measure_import
+from bench_import import STATEMENTS as IMPORT_STATEMENTS
+from stubserver import StubServer
+from opengever.apiclient import GEVERClient
+from opengever.apiclient.session import GEVERSession
+
+
+USERNAME = 'john.doe'
+
+
+def result(value, unit, higher_is_better=True):
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def bench_wrap(server, args):
+    client = GEVERClient(server.dossier_url, USERNAME, lazy_models=True)
+    items = server.server.items
+    seconds = timed(lambda: [client.wrap(item) for item in items])
+    return {'wrap': result(len(items) / seconds, 'models/s')}
+
+
+def bench_token(server, args):
+    def acquire():
+        for _ in range(args.tokens):
+            GEVERSession.clear()
+            GEVERSession(server.url, USERNAME)()
+
+    seconds = timed(acquire)
+    return {'token_acquisition': result(args.tokens / seconds, 'tokens/s')}
+
+
+def bench_listing(server, args):
+    client = GEVERClient(server.dossier_url, USERNAME, lazy_models=True)
+    results = {}
+    for name, kwargs in (('listing_iteration', {}),
+                         ('listing_iteration_incremental', {'incremental': True})):
+        try:
+            seconds = timed(lambda: sum(1 for _ in client.iter_listing(
+                'documents', batch_size=args.batch_size, **kwargs)))
+        except ImportError:
+            continue
+        results[name] = result(args.items / seconds, 'items/s')
+    return results
+
+
+def bench_upload(server, args):
+    client = GEVERClient(server.dossier_url, USERNAME)
+    size = args.upload_mb * 1024 * 1024
+    data = BytesIO(b'x' * size)
+    seconds = timed(lambda: client.create_document(
+        'Upload', data, 'application/octet-stream', 'upload.bin', size=size, raw=True))
+    return {'upload_throughput': result(args.upload_mb / seconds, 'MB/s')}
+
+
+def bench_memory(server, args):
+    client = GEVERClient(server.dossier_url, USERNAME, lazy_models=True)
+    payload = json.dumps({'items': server.server.items[:10000]}).encode('utf-8')
+    tracemalloc.start()
+    try:
+        models = [client.wrap(item) for item in json.loads(payload)['items']]
+        current, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'memory_per_10k_models': result(current * 10000 / len(models), 'bytes',
+                                            higher_is_better=False)}
+
+
+def bench_import(server, args):
+    baseline = measure_import('pass', args.import_repeat)
+    return {f'{name}_import_time': result(
+        max(0.0, measure_import(statement, args.import_repeat) - baseline), 's',
+        higher_is_better=False)
+        for name, statement in IMPORT_STATEMENTS.items()}
+
+
+BENCHMARKS = {
+    'wrap': bench_wrap,
+    'token': bench_token,
+    'listing': bench_listing,
+    'upload': bench_upload,
+    'memory': bench_memory,
+    'import': bench_import,
+}
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f'The benchmarks to run: {", ".join(BENCHMARKS)}. '
+                        'Defaults to all.')
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--tokens', type=int, default=100)
+    parser.add_argument('--upload-mb', type=int, default=32)
+    parser.add_argument('--import-repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write the results to this file instead of stdout.')
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'Unknown benchmarks: {", ".join(sorted(unknown))}')
+
+    results = {}
+    with StubServer(items=args.items) as server:
+        for name in args.benchmarks or BENCHMARKS:
+            results.update(BENCHMARKS[name](server, args))
+
+    output = json.dumps({
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'results': results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""An in-process GEVER stub server for the benchmarks.
+
+The stub serves ``@@oauth2-token``, ``@listing``, ``@navigation``,
+``@tus-upload`` and object GETs from canned payloads (see bench_json), so
+that the client-side overhead can be measured without a GEVER. It keeps the
+connections alive like a real GEVER behind a proxy.
+
+Usage:
+
+    with StubServer(items=10000) as server:
+        client = GEVERClient(server.dossier_url, 'john.doe')
+"""
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+import itertools
+import json
+import tempfile
+import threading
+
+from bench_json import listing_payload
+from bench_json import navigation_payload
+from opengever.apiclient.keys import KeyRegistry
+
+
+KEY_FILE = (Path(__file__).parent.parent / 'opengever' / 'apiclient'
+            / 'tests' / 'keys' / 'test-gever.json')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path.endswith('/@listing'):
+            self._listing()
+        elif path.endswith('/@navigation'):
+            self._send_json(self.server.navigation)
+        else:
+            self._send_json(self._object(path))
+
+    def do_POST(self):
+        self._read_body()
+        path = urlsplit(self.path).path
+        if path.endswith('/@@oauth2-token'):
+            self._send_json({'access_token': 'stub-token', 'token_type': 'Bearer',
+                             'expires_in': 3600})
+        elif path.endswith('/@tus-upload'):
+            upload_id = next(self.server.upload_ids)
+            self.server.uploads[upload_id] = [int(self.headers['Upload-Length']), 0]
+            self._send(201, headers={'Location': f'{self.server.url}@tus-upload/{upload_id}'})
+        else:
+            self._send(404)
+
+    def do_PATCH(self):
+        size = len(self._read_body())
+        upload_id = urlsplit(self.path).path.rsplit('/', 1)[-1]
+        upload = self.server.uploads.get(upload_id)
+        if upload is None:
+            self._send(404)
+            return
+
+        upload[1] += size
+        headers = {'Upload-Offset': str(upload[1])}
+        if upload[1] >= upload[0]:
+            headers['Location'] = f'{self.server.dossier_url}/document-{upload_id}'
+        self._send(204, headers=headers)
+
+    def do_HEAD(self):
+        upload_id = urlsplit(self.path).path.rsplit('/', 1)[-1]
+        upload = self.server.uploads.get(upload_id, [0, 0])
+        self._send(200, headers={'Upload-Offset': str(upload[1])})
+
+    def _listing(self):
+        query = parse_qs(urlsplit(self.path).query)
+        b_start = int(query.get('b_start', ['0'])[0])
+        b_size = int(query.get('b_size', ['25'])[0])
+        items = self.server.items
+        self._send_json({
+            '@id': f'{self.server.dossier_url}/@listing',
+            'b_start': b_start,
+            'b_size': b_size,
+            'items_total': len(items),
+            'items': items[b_start:b_start + b_size],
+        })
+
+    def _object(self, path):
+        url = f'{self.server.root}{path}'
+        return {
+            '@id': url,
+            '@type': 'opengever.document.document',
+            'title': 'Vertragsentwurf',
+            'created': '2016-08-31T14:07:33+00:00',
+            'modified': '2016-08-31T16:05:33+00:00',
+            'parent': {'@id': self.server.dossier_url,
+                       '@type': 'opengever.dossier.businesscasedossier'},
+            'file': {'size': 27413, 'download': f'{url}/@@download'},
+            'items': [],
+        }
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def _send_json(self, data):
+        self._send(200, json.dumps(data).encode('utf-8'),
+                   {'Content-Type': 'application/json'})
+
+    def _send(self, status, body=b'', headers={}):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer:
+    """Runs the stub in a thread and registers a service key for it in the
+    KeyRegistry while it runs.
+    """
+
+    def __init__(self, items=10000):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.daemon_threads = True
+        host, port = self.server.server_address
+        self.server.root = f'http://{host}:{port}'
+        self.server.url = self.url = f'{self.server.root}/fd/'
+        self.server.dossier_url = self.dossier_url = f'{self.url}ordnungssystem/dossier-1'
+        self.server.items = listing_payload(items, f'{self.url}ordnungssystem')['items']
+        self.server.navigation = navigation_payload(items, f'{self.url}ordnungssystem')
+        self.server.uploads = {}
+        self.server.upload_ids = map(str, itertools.count(1))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.keys_directory = tempfile.TemporaryDirectory()
+
+    def __enter__(self):
+        key = json.loads(KEY_FILE.read_text())
+        key['token_uri'] = f'{self.url}@@oauth2-token'
+        Path(self.keys_directory.name, 'stub.json').write_text(json.dumps(key))
+        KeyRegistry.load_keys(self.keys_directory.name)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self.keys_directory.cleanup()
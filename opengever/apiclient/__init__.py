@@ -3,4 +3,9 @@ import logging
 LOG = logging.getLogger('opengever.apiclient')
 
 
-from .client import GEVERClient  # noqa
+def __getattr__(name):
+    # The client is imported on first use, so that importing the package is cheap.
+    if name == 'GEVERClient':
+        from .client import GEVERClient
+        return GEVERClient
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
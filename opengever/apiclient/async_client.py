@@ -0,0 +1,208 @@
+from base64 import b64encode
+
+from .async_session import AsyncGEVERSession
+from .models import ModelRegistry
+from .utils import async_autowrap
+
+
+class AsyncGEVERClient:
+    """The AsyncGEVERClient is the asyncio counterpart of the GEVERClient.
+    It offers the same methods as coroutines, so that an event loop can keep many
+    GEVER requests in flight at the same time.
+
+    Model objects wrapped by the async client are bound to an AsyncGEVERClient:
+    the client methods of wrapped models must be awaited, and the models must
+    be fetched with ``afetch`` instead of ``fetch``.
+    """
+
+    is_async = True
+
+    upload_chunk_size = 64 * 1024
+
+    # When enabled, wrapped models adopt their client on first use only.
+    lazy_models = False
+
+    def __init__(self, url, username, headers={}, lazy_models=None, session=None):
+        """
+        :param url: The base URL to a resource in GEVER without the view.
+        :type url: string
+        :param username: A GEVER username. All actions are performed in the name
+          of this user.
+        :type username: string
+        :param lazy_models: Whether models wrapped by this client create their
+          own client only when it is used.
+        :type lazy_models: bool
+        :param session: An AsyncGEVERSession of the same user to reuse, when it
+          is responsible for the url.
+        :type session: AsyncGEVERSession
+        """
+        self.url = url.rstrip("/")  # Remove trailing slash(es).
+        self.username = username
+        if session is not None and session.is_responsible_for(url, username):
+            self.session = session
+        else:
+            self.session = AsyncGEVERSession(url, username, headers)
+        if lazy_models is not None:
+            self.lazy_models = lazy_models
+
+    def adopt(self, url):
+        """Create and return a new AsyncGEVERClient instance for the passed url.
+        The new client shares the session of this client when the url belongs
+        to the same GEVER.
+        :param url: The base URL to a resource in GEVER without the view.
+        :type url: string
+        """
+        return type(self)(url, self.username, lazy_models=self.lazy_models,
+                          session=self.session)
+
+    def wrap(self, item, columns=None):
+        """Wrap an item into a API model object.
+        When columns are passed, the model keeps only these keys of the item.
+        """
+        return ModelRegistry.wrap(item, self, columns)
+
+    async def _request(self, method, url, **kwargs):
+        """Make a request with the prepared session and return the response.
+        """
+        session = await self.session()
+        return await session.request(method, url, **kwargs)
+
+    async def _request_json(self, method, url, **kwargs):
+        """Make a request and return the decoded JSON response.
+        """
+        return self.session.decode(await self._request(method, url, **kwargs))
+
+    @async_autowrap
+    async def fetch(self, **kwargs):
+        """Fetch the full object with the configured URL and return the object
+        representation.
+        """
+        return await self._request_json('GET', self.url, params=kwargs)
+
+    @async_autowrap
+    async def create_dossier(self, title, **data):
+        data.setdefault('responsible', self.username)
+        data.update({'@type': 'opengever.dossier.businesscasedossier',
+                     'title': title})
+        return await self._request_json('POST', self.url, json=data)
+
+    async def get_navigation(self, raw=False):
+        if not raw:
+            raise NotImplementedError(
+                'get_navigation currently does not support autowrapping its items, please use raw=True.'
+            )
+        return await self._request_json('GET', f'{self.url}/@navigation')
+
+    async def listing(self, name, columns=None, raw=False, **kwargs):
+        """
+        Listing of specific types for given URL (https://docs.onegovgever.ch/dev-manual/api/listings/)
+        Results are casted into model objects.
+        Without columns, the default listing columns of the model are requested.
+        """
+        kwargs['name'] = name
+        if columns is None:
+            columns = ModelRegistry.listing_columns(name)
+
+        kwargs['columns:list'] = ['@type']
+        kwargs['columns:list'].extend(columns)
+
+        response = await self._request_json('GET', f'{self.url}/@listing', params=kwargs)
+        if raw:
+            return response
+
+        response['items'] = [self.wrap(item=item) for item in response['items']]
+        return response
+
+    async def update_object(self, **data):
+        return (await self._request('PATCH', self.url, json=data)).is_success
+
+    async def get_office_connector_url(self):
+        """
+        Returns the Office Connector checkout url ("oc:....") for the GEVER document located at `self.url`.
+        """
+        response = await self._request_json('GET', f"{self.url}/officeconnector_checkout_url")
+        return response["url"]
+
+    async def allowed_roles_and_principals(self):
+        """
+        This feature was introduced in opengever.core 2020.3.0.
+        """
+        response = await self._request_json('GET', f'{self.url}/@allowed-roles-and-principals')
+        return response['allowed_roles_and_principals']
+
+    async def ogds_user(self):
+        return await self._request_json('GET', f'{self.url}/@ogds-users/{self.username}')
+
+    async def user(self):
+        userid = (await self.ogds_user())['userid']
+        return await self._request_json('GET', f'{self.url}/@users/{userid}')
+
+    @async_autowrap
+    async def create_document(self, title, file, content_type, filename, size=None):
+        """
+        :param title: The title of the document
+        :param file: The content of the file: bytes, a readable IO or an
+          (async) iterable of bytes
+        :param content_type: The content type of the document
+        :param filename: The filename of the document
+        :param size: The size of the file, if omitted file.size is used
+        """
+        if size is None:
+            size = file.size
+        size = str(size)
+
+        b64_filename = str(b64encode(filename.encode('utf-8')), 'utf-8')
+        b64_content_type = str(b64encode(content_type.encode('utf-8')), 'utf-8')
+        b64_portal_type = str(b64encode(b'opengever.document.document'), 'utf-8')
+        tus = await self._request('POST', f'{self.url}/@tus-upload', headers={
+            'Tus-Resumable': '1.0.0',
+            'Upload-Length': size,
+            'Upload-Metadata': f'filename {b64_filename},content-type {b64_content_type},@type {b64_portal_type}',
+        })
+
+        if hasattr(file, 'read'):
+            file = self._aiter_file(file)
+
+        created_document = await self._request(
+            'PATCH',
+            tus.headers['Location'],
+            headers={
+                'Tus-Resumable': '1.0.0',
+                'Upload-Offset': '0',
+                'Content-Type': 'application/offset+octet-stream'
+            },
+            content=file,
+        )
+
+        return await self._request_json('GET', created_document.headers['Location'])
+
+    async def _aiter_file(self, file):
+        """Stream a readable IO in chunks, without reading it into memory.
+        """
+        while True:
+            chunk = file.read(self.upload_chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    async def sharing(self):
+        return await self._request_json('GET', f'{self.url}/@sharing')
+
+    async def set_group_roles(self, name, roles):
+        """
+        https://plonerestapi.readthedocs.io/en/latest/sharing.html#updating-local-roles
+        """
+        data = {
+            "entries": [
+                {
+                    "id": name,
+                    "type": "group",
+                    "roles": roles
+                }
+            ],
+        }
+        response = await self._request('POST', f'{self.url}/@sharing', json=data)
+        return response.is_success
+
+    async def group(self, name):
+        return await self._request_json('GET', f"{self.url}/@groups/{name}")
@@ -0,0 +1,209 @@
+import asyncio
+import weakref
+
+from .exceptions import APIRequestException
+from .exceptions import AuthorizationFailed
+from .exceptions import ServiceKeyMissing
+from .jsoncodec import get_codec
+from .keys import KeyRegistry
+from .session import GEVERSession
+from .session import get_user_agent
+from .session import make_grant
+from .session import unfrozen_time
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class AsyncSessionPool:
+    """The async session pool holds the ``httpx.AsyncClient`` sessions.
+
+    An ``httpx.AsyncClient`` is bound to the event loop it is used in, therefore
+    the sessions are pooled per event loop and per GEVER base URL and username.
+    Within an event loop, all clients of a user share the bearer token and the
+    connections of one session.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Remove all sessions from the pool.
+        """
+        self.loops = weakref.WeakKeyDictionary()
+
+    def _storage(self):
+        loop = asyncio.get_event_loop()
+        if loop not in self.loops:
+            self.loops[loop] = {'sessions': {}, 'locks': {}}
+        return self.loops[loop]
+
+    def lock_for(self, key):
+        """Returns the lock serializing token acquisition for the session key.
+        """
+        return self._storage()['locks'].setdefault(key, asyncio.Lock())
+
+    async def get(self, key, factory):
+        """Returns the session for the key, creating it with the async factory
+        when missing.
+        """
+        sessions = self._storage()['sessions']
+        if key not in sessions:
+            async with self.lock_for(key):
+                if key not in sessions:
+                    sessions[key] = await factory()
+        return sessions[key]
+
+    def invalidate(self, base_urls):
+        """Make the sessions of the GEVER base URLs acquire a new token on their
+        next request, e.g. because their keys have changed.
+        """
+        for storage in list(self.loops.values()):
+            for key, session in list(storage['sessions'].items()):
+                if key[0] in base_urls:
+                    session.gever_token_expiration = 0
+
+    async def aclose(self):
+        """Close all sessions of the current event loop.
+        """
+        sessions = self._storage()['sessions']
+        while sessions:
+            _key, session = sessions.popitem()
+            await session.aclose()
+
+
+ASYNC_SESSION_POOL = AsyncSessionPool()
+KeyRegistry.subscribe(ASYNC_SESSION_POOL.invalidate)
+
+
+class AsyncGEVERSession:
+    """The async GEVER session provides ``httpx.AsyncClient`` sessions which are
+    preconfigured for an async GEVER client.
+
+    It is the asyncio counterpart of the ``GEVERSession``: the session is called
+    (and awaited) right before each request and returns an ``httpx.AsyncClient``
+    with a valid authorization header.
+    """
+
+    min_seconds_to_expiration = GEVERSession.min_seconds_to_expiration
+    session_expiration_seconds = GEVERSession.session_expiration_seconds
+
+    # Connection pooling of the httpx sessions.
+    max_connections = 100
+    max_keepalive_connections = 20
+
+    json_codec = GEVERSession.json_codec
+
+    def __init__(self, url, username, headers={}):
+        if httpx is None:
+            raise ImportError(
+                'The async GEVER client requires httpx, '
+                'install "opengever.apiclient[async]".')
+
+        self.gever_base_url = KeyRegistry.get_base_url_for(url)
+        if not self.gever_base_url:
+            raise ServiceKeyMissing(url)
+
+        self.username = username
+        self.headers = headers
+
+    async def __call__(self):
+        """Returns an ``httpx.AsyncClient`` which is prepared for making a request
+        to the GEVER client, with an authorization header which is valid in
+        the near future.
+        """
+        session = await ASYNC_SESSION_POOL.get(self._session_key, self._make_session)
+        if self._token_expires_soon(session):
+            async with ASYNC_SESSION_POOL.lock_for(self._session_key):
+                if self._token_expires_soon(session):
+                    await self._acquire_authorization_token(session)
+        return session
+
+    @staticmethod
+    def clear():
+        """Clear all caches.
+        """
+        ASYNC_SESSION_POOL.clear()
+
+    def is_responsible_for(self, url, username):
+        """Whether this session can be used for requests to url in the name of
+        username, i.e. whether url has the same GEVER base URL. The lookup is
+        memoized by the KeyRegistry.
+        """
+        return (username == self.username
+                and KeyRegistry.get_base_url_for(url) == self.gever_base_url)
+
+    def decode(self, response):
+        """Decode the JSON body of a response with the JSON codec.
+        """
+        return get_codec(self.json_codec).loads(response.content)
+
+    @staticmethod
+    async def aclose():
+        """Close the sessions of the running event loop.
+        """
+        await ASYNC_SESSION_POOL.aclose()
+
+    @property
+    def _session_key(self):
+        return (self.gever_base_url, self.username)
+
+    def _token_expires_soon(self, session):
+        token_expiration = session.gever_token_expiration
+        return unfrozen_time() > (token_expiration - self.min_seconds_to_expiration)
+
+    async def _make_session(self):
+        """Create a fresh httpx session and return it.
+        """
+        session = httpx.AsyncClient(
+            headers={
+                "User-Agent": get_user_agent(),
+                "Accept": "application/json",
+                **self.headers,
+            },
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections),
+            event_hooks={"response": [self._raise_for_status_hook]},
+            timeout=None,
+        )
+        try:
+            await self._acquire_authorization_token(session)
+        except BaseException:
+            await session.aclose()
+            raise
+        return session
+
+    async def _raise_for_status_hook(self, response):
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exception:
+            # Read the body so that it is included in the exception log.
+            await response.aread()
+            raise APIRequestException(exception)
+
+    async def _acquire_authorization_token(self, session):
+        """Acquires a fresh authorization token from GEVER and sets it in the
+        given session.
+        """
+        service_key = KeyRegistry.get_key_for(self.gever_base_url)
+        if service_key is None:
+            raise ServiceKeyMissing(self.gever_base_url)
+
+        payload, expiration = make_grant(
+            service_key, self.username, self.session_expiration_seconds,
+            KeyRegistry.get_signing_key_for(self.gever_base_url))
+        # The token request must not go through the session, because its
+        # response hook raises APIRequestException instead of AuthorizationFailed.
+        async with httpx.AsyncClient() as token_client:
+            response = await token_client.post(service_key["token_uri"], data=payload)
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exception:
+            raise AuthorizationFailed(exception)
+
+        bearer_token = response.json()["access_token"]
+        session.headers["Authorization"] = f"Bearer {bearer_token}"
+        session.gever_token_expiration = expiration
@@ -0,0 +1,50 @@
+import time
+
+
+class BatchResult:
+    """The result of a batch operation processing many items.
+
+    ``results`` has one entry per input item, in input order; items which failed
+    have ``None`` as result and their exception in ``errors``, keyed by the
+    item's key (e.g. its index). Failures never abort the batch.
+    """
+
+    def __init__(self):
+        self.results = []
+        self.errors = {}
+        self.started = time.monotonic()
+        self.finished = None
+
+    def add_result(self, result):
+        self.results.append(result)
+
+    def add_error(self, key, exception):
+        self.results.append(None)
+        self.errors[key] = exception
+
+    def finish(self):
+        self.finished = time.monotonic()
+        return self
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    @property
+    def duration(self):
+        """Seconds the batch took (so far).
+        """
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def metrics(self):
+        """Throughput metrics of the batch.
+        """
+        duration = self.duration
+        return {
+            'items': len(self.results),
+            'succeeded': len(self.results) - len(self.errors),
+            'failed': len(self.errors),
+            'duration': duration,
+            'items_per_second': len(self.results) / duration if duration else 0.0,
+        }
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class CacheEntry:
+
+    def __init__(self, data, etag, last_modified, expires):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.expires
+
+    @property
+    def revalidatable(self):
+        return bool(self.etag or self.last_modified)
+
+
+class ResponseCache:
+    """The response cache keeps the JSON responses of GET requests in memory.
+
+    Entries are keyed by user, URL and params. They are served without a request
+    for ``ttl`` seconds; afterwards they are revalidated with a conditional request
+    (``If-None-Match`` / ``If-Modified-Since``) when GEVER has sent an ``ETag``
+    or ``Last-Modified`` header, so that an unchanged resource only costs a 304.
+    The least recently used entries are evicted when there are more than
+    ``max_entries``.
+
+    The cached data is shared between all callers and must not be modified.
+    """
+
+    def __init__(self, ttl=60, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Remove all entries and reset the counters.
+        """
+        with self._lock:
+            self.entries = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+            self.revalidations = 0
+
+    @property
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+        }
+
+    def get_json(self, session, url, params=None):
+        """Return the JSON response for a GET request of url with params, made
+        with the GEVERSession session when the cache cannot serve it.
+        """
+        params_key = tuple(sorted((name, repr(value)) for name, value in (params or {}).items()))
+        key = (session.gever_base_url, session.username, url, params_key)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                if not entry.expired:
+                    self.hits += 1
+                    return entry.data
+
+        headers = {}
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+
+        response = session().get(url, params=params, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self.revalidations += 1
+                entry.expires = time.monotonic() + self.ttl
+            return entry.data
+
+        data = session.decode(response)
+        entry = CacheEntry(data,
+                           response.headers.get('ETag'),
+                           response.headers.get('Last-Modified'),
+                           time.monotonic() + self.ttl)
+        with self._lock:
+            self.misses += 1
+            if self.ttl > 0 or entry.revalidatable:
+                self.entries[key] = entry
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return data
+
+    def invalidate(self, url):
+        """Remove all entries of url and the URLs below it.
+        """
+        url = url.rstrip('/')
+        below = f'{url}/'
+        with self._lock:
+            for key in [key for key in self.entries
+                        if key[2] == url or key[2].startswith(below)]:
+                del self.entries[key]
@@ -1,111 +1,378 @@
 from base64 import b64encode
+from collections import deque
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from urllib.parse import urlparse
 
+from .batch import BatchResult
+from .exceptions import APIRequestException
 from .models import ModelRegistry
 from .session import GEVERSession
+from .upload import ChunkedUpload
+from .upload import TUS_VERSION
 from .utils import autowrap
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 
 class GEVERClient:
     """The GEVERClient is used for communicating with GEVER through the GEVER REST API.
     It is instantiated for a specific GEVER resource in the name of a specific user.
     """
 
-    def __init__(self, url, username, headers={}):
+    # Documents are uploaded in chunks of this size; a failing chunk is resumed
+    # up to upload_retries times.
+    upload_chunk_size = 8 * 1024 * 1024
+    upload_retries = 3
+
+    # When enabled, wrapped models adopt their client on first use only.
+    lazy_models = False
+
+    # Number of objects fetched per @search request by fetch_many.
+    search_batch_size = 100
+
+    def __init__(self, url, username, headers={}, cache=None, lazy_models=None, session=None):
         """
         :param url: The base URL to a resource in GEVER without the view.
         :type url: string
         :param username: A GEVER username. All actions are performed in the name
           of this user.
         :type username: string
+        :param cache: An optional ResponseCache for caching GET responses of
+          fetch, get_navigation, sharing, group and ogds_user.
+        :type cache: ResponseCache
+        :param lazy_models: Whether models wrapped by this client create their
+          own client only when it is used.
+        :type lazy_models: bool
+        :param session: A GEVERSession of the same user to reuse, when it is
+          responsible for the url.
+        :type session: GEVERSession
         """
         self.url = url.rstrip("/")  # Remove trailing slash(es).
         self.username = username
-        self.session = GEVERSession(url, username, headers)
+        if session is not None and session.is_responsible_for(url, username):
+            self.session = session
+        else:
+            self.session = GEVERSession(url, username, headers)
+        self.cache = cache
+        if lazy_models is not None:
+            self.lazy_models = lazy_models
 
     def adopt(self, url):
         """Create and return a new GEVERClient instance for the passed url.
+        The new client shares the session of this client when the url belongs
+        to the same GEVER.
         :param url: The base URL to a resource in GEVER without the view.
         :type url: string
         """
-        return type(self)(url, self.username)
+        return type(self)(url, self.username, cache=self.cache,
+                          lazy_models=self.lazy_models, session=self.session)
 
-    def wrap(self, item):
+    def wrap(self, item, columns=None):
         """Wrap an item into a API model object.
+        When columns are passed, the model keeps only these keys of the item.
         """
-        return ModelRegistry.wrap(item, self)
+        return ModelRegistry.wrap(item, self, columns)
+
+    def _get_json(self, url, params=None):
+        """Make a GET request and return the JSON response, using the cache
+        when configured.
+        """
+        if self.cache is None:
+            return self.session.decode(self.session().get(url, params=params))
+        return self.cache.get_json(self.session, url, params)
+
+    def _invalidate_cache(self):
+        if self.cache is not None:
+            self.cache.invalidate(self.url)
 
     @autowrap
     def fetch(self, **kwargs):
         """Fetch the full object with the configured URL and return the object
         representation.
         """
-        return self.session().get(self.url, params=kwargs).json()
+        return self._get_json(self.url, params=kwargs)
+
+    def fetch_many(self, urls, workers=8, raw=False, use_search=False, columns=None):
+        """
+        Fetch the full objects of many URLs concurrently.
+        Duplicate URLs are fetched once.
+
+        :param urls: Iterable of object URLs
+        :param workers: The number of concurrent requests
+        :param use_search: Collapse the objects into few @search requests with
+          path filters and full objects. URLs which the search does not return
+          are fetched one by one.
+        :param columns: Keep only these keys of the wrapped objects, see
+          ``APIModel``
+        :returns: A BatchResult with the objects in the order of the (deduplicated)
+          URLs and the exceptions of failed URLs, keyed by URL
+        """
+        result = BatchResult()
+        urls = list(OrderedDict.fromkeys(url.rstrip('/') for url in urls))
+        fetched = self._search_full_objects(urls) if use_search else {}
+
+        def fetch(url):
+            return self.adopt(url).fetch(raw=True)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {url: executor.submit(fetch, url) for url in urls if url not in fetched}
+            for url in urls:
+                try:
+                    item = fetched[url] if url in fetched else futures[url].result()
+                except Exception as exception:
+                    result.add_error(url, exception)
+                else:
+                    result.add_result(item if raw else self.wrap(item, columns))
+
+        return result.finish()
+
+    def _search_full_objects(self, urls):
+        """Search the full objects of the URLs in batches and return them by URL.
+        Failing searches are ignored, their objects are then missing in the result.
+        """
+        base_url = self.session.gever_base_url
+        urls = [url for url in urls if url.startswith(base_url)]
+        found = {}
+        for start in range(0, len(urls), self.search_batch_size):
+            paths = [urlparse(url).path for url in urls[start:start + self.search_batch_size]]
+            try:
+                response = self.session.decode(self.session().get(f'{base_url}@search', params={
+                    'path.query:list': paths,
+                    'path.depth:int': 0,
+                    'fullobjects:int': 1,
+                    'b_size:int': len(paths),
+                }))
+            except APIRequestException:
+                continue
+
+            for item in response.get('items', []):
+                found[item['@id'].rstrip('/')] = item
+        return found
 
     @autowrap
     def create_dossier(self, title, **data):
         data.setdefault('responsible', self.username)
         data.update({'@type': 'opengever.dossier.businesscasedossier',
                      'title': title})
-        return self.session().post(self.url, json=data).json()
+        response = self.session().post(self.url, json=data)
+        self._invalidate_cache()
+        return self.session.decode(response)
 
     def get_navigation(self, raw=False):
         if not raw:
             raise NotImplementedError(
                 'get_navigation currently does not support autowrapping its items, please use raw=True.'
             )
-        return self.session().get(f'{self.url}/@navigation').json()
+        return self._get_json(f'{self.url}/@navigation')
 
-    def listing(self, name, columns=[], raw=False, **kwargs):
+    def listing(self, name, columns=None, raw=False, **kwargs):
         """
         Listing of specific types for given URL (https://docs.onegovgever.ch/dev-manual/api/listings/)
         Results are casted into model objects.
+        Without columns, the default listing columns of the model are requested.
         """
+        params = self._listing_params(name, columns, **kwargs)
+        response = self.session.decode(self.session().get(f'{self.url}/@listing', params=params))
+        if raw:
+            return response
+
+        response['items'] = [self.wrap(item=item) for item in response['items']]
+        return response
+
+    def _listing_params(self, name, columns, **kwargs):
         kwargs['name'] = name
+        if columns is None:
+            columns = ModelRegistry.listing_columns(name)
 
         kwargs['columns:list'] = ['@type']
         kwargs['columns:list'].extend(columns)
+        return kwargs
 
-        response = self.session().get(f'{self.url}/@listing', params=kwargs).json()
-        if raw:
-            return response
+    def iter_listing(self, name, columns=None, batch_size=100, raw=False,
+                     incremental=False, **kwargs):
+        """
+        Iterate over all items of a listing, fetching it batch by batch.
+        The next batch is fetched in the background while the items of the current
+        batch are consumed, so that at most two batches are held in memory.
+        Items are casted into model objects unless raw is set.
 
-        response['items'] = [self.wrap(item=item) for item in response['items']]
-        return response
+        With incremental, the responses are streamed and decoded item by item
+        with ijson instead, so that no batch is held in memory as a whole.
+        The batches are then fetched one after the other.
+        """
+        if incremental:
+            yield from self._iter_listing_incremental(name, columns, batch_size, raw, kwargs)
+            return
+
+        def fetch_batch(b_start):
+            return self.listing(name, columns=columns, raw=True,
+                                b_start=b_start, b_size=batch_size, **kwargs)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            b_start = 0
+            batch = executor.submit(fetch_batch, b_start)
+            while batch is not None:
+                response = batch.result()
+                items = response['items']
+                b_start += len(items)
+                if items and b_start < response['items_total']:
+                    batch = executor.submit(fetch_batch, b_start)
+                else:
+                    batch = None
+
+                del response
+                for item in items:
+                    yield item if raw else self.wrap(item)
+
+    def _iter_listing_incremental(self, name, columns, batch_size, raw, kwargs):
+        if ijson is None:
+            raise ImportError(
+                'Decoding listings incrementally requires ijson, '
+                'install "opengever.apiclient[speedups]".')
+
+        b_start = 0
+        while True:
+            params = self._listing_params(name, columns, b_start=b_start,
+                                          b_size=batch_size, **kwargs)
+            items_total = None
+            count = 0
+            builder = None
+            with self.session().get(f'{self.url}/@listing', params=params,
+                                    stream=True) as response:
+                response.raw.decode_content = True
+                for prefix, event, value in ijson.parse(response.raw, use_float=True):
+                    if prefix == 'items_total':
+                        items_total = value
+                    elif prefix == 'items.item' and event == 'start_map':
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+                    elif builder is not None:
+                        builder.event(event, value)
+                        if prefix == 'items.item' and event == 'end_map':
+                            count += 1
+                            yield builder.value if raw else self.wrap(builder.value)
+                            builder = None
+
+            b_start += count
+            if not count or items_total is None or b_start >= items_total:
+                return
+
+    def walk(self, max_depth=None, types=None, workers=8, batch_size=None,
+             raw=False, cancel=None):
+        """
+        Traverse the tree below the configured URL breadth-first and yield the
+        objects as they are found.
+        The children of the containers are fetched concurrently in @search batches
+        (path.depth 1), which return summaries instead of full objects.
+        Every object is yielded once, even when it is found multiple times.
+
+        :param max_depth: The maximum depth to traverse, 1 yields the children only.
+        :param types: Only yield objects of these portal types. The walk still
+          traverses all containers.
+        :param workers: The maximum number of concurrent requests.
+        :param batch_size: The number of children fetched per request, defaults
+          to search_batch_size.
+        :param raw: Yield dicts instead of model objects.
+        :param cancel: An optional threading.Event stopping the walk when set.
+          Closing the generator stops the walk as well.
+        """
+        batch_size = batch_size or self.search_batch_size
+        types = frozenset(types) if types else None
+        visited = {self.url}
+        # Batches to fetch: container URL, depth of its children and b_start.
+        pending = deque([(self.url, 1, 0)])
+
+        def fetch_children(url, b_start):
+            response = self.session().get(f'{url}/@search', params={
+                'path.depth:int': 1,
+                'b_start:int': b_start,
+                'b_size:int': batch_size,
+                'metadata_fields:list': ['is_folderish'],
+            })
+            return self.session.decode(response)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            running = {}
+            try:
+                while pending or running:
+                    if cancel is not None and cancel.is_set():
+                        return
+
+                    while pending and len(running) < workers:
+                        url, depth, b_start = pending.popleft()
+                        future = executor.submit(fetch_children, url, b_start)
+                        running[future] = (url, depth, b_start)
+
+                    done, _not_done = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url, depth, b_start = running.pop(future)
+                        response = future.result()
+                        items = response.get('items', [])
+                        if items and b_start + len(items) < response.get('items_total', 0):
+                            pending.append((url, depth, b_start + len(items)))
+
+                        for item in items:
+                            item_url = item['@id'].rstrip('/')
+                            if item_url in visited:
+                                continue
+                            visited.add(item_url)
+
+                            if item.get('is_folderish', True) and (
+                                    max_depth is None or depth < max_depth):
+                                pending.append((item_url, depth + 1, 0))
+                            if types is None or item['@type'] in types:
+                                if cancel is not None and cancel.is_set():
+                                    return
+                                yield item if raw else self.wrap(item)
+            finally:
+                for future in running:
+                    future.cancel()
 
     def update_object(self, **data):
-        return self.session().patch(self.url, json=data).ok
+        response = self.session().patch(self.url, json=data)
+        self._invalidate_cache()
+        return response.ok
 
     def get_office_connector_url(self):
         """
         Returns the Office Connector checkout url ("oc:....") for the GEVER document located at `self.url`.
         """
-        return self.session().get(f"{self.url}/officeconnector_checkout_url").json()["url"]
+        response = self.session().get(f"{self.url}/officeconnector_checkout_url")
+        return self.session.decode(response)["url"]
 
     def allowed_roles_and_principals(self):
         """
         This feature was introduced in opengever.core 2020.3.0. To do: define testing setup for multiple GEVER versions.
         """
-        return (
-            self.session()
-            .get(f'{self.url}/@allowed-roles-and-principals')
-            .json()['allowed_roles_and_principals']
-        )
+        response = self.session().get(f'{self.url}/@allowed-roles-and-principals')
+        return self.session.decode(response)['allowed_roles_and_principals']
 
     def ogds_user(self):
-        return self.session().get(f'{self.url}/@ogds-users/{self.username}').json()
+        return self._get_json(f'{self.url}/@ogds-users/{self.username}')
 
     def user(self):
         userid = self.ogds_user()['userid']
-        return self.session().get(f'{self.url}/@users/{userid}').json()
+        return self.session.decode(self.session().get(f'{self.url}/@users/{userid}'))
 
     @autowrap
-    def create_document(self, title, file, content_type, filename, size=None):
+    def create_document(self, title, file, content_type, filename, size=None,
+                        chunk_size=None, progress=None):
         """
         :param title: The title of the document
-        :param file: Readable IO which holds the content of the file
+        :param file: Bytes, readable IO or iterable of bytes which holds the content of the file
         :param content_type: The content type of the document
         :param filename: The filename of the document
         :param size: The size of the file, if omitted file.size is used
+        :param chunk_size: The maximum number of bytes uploaded per request,
+          defaults to upload_chunk_size
+        :param progress: Optional callable, called with the number of uploaded
+          bytes and the size after each uploaded chunk
         """
         if size is None:
             size = file.size
@@ -115,25 +382,61 @@ class GEVERClient:
         b64_content_type = str(b64encode(content_type.encode('utf-8')), 'utf-8')
         b64_portal_type = str(b64encode(b'opengever.document.document'), 'utf-8')
         tus = self.session().post(f'{self.url}/@tus-upload', headers={
-            'Tus-Resumable': '1.0.0',
+            'Tus-Resumable': TUS_VERSION,
             'Upload-Length': size,
             'Upload-Metadata': f'filename {b64_filename},content-type {b64_content_type},@type {b64_portal_type}',
         })
 
-        created_document = self.session().patch(
+        upload = ChunkedUpload(
+            self.session,
             tus.headers['Location'],
-            headers={
-                'Tus-Resumable': '1.0.0',
-                'Upload-Offset': '0',
-                'Content-Type': 'application/offset+octet-stream'
-            },
-            data=file,
+            file,
+            size,
+            chunk_size=chunk_size or self.upload_chunk_size,
+            retries=self.upload_retries,
+            progress=progress,
         )
+        created_document = upload()
+        self._invalidate_cache()
+
+        return self.session.decode(self.session().get(created_document.headers['Location']))
+
+    def bulk_create_documents(self, documents, workers=4, raw=False):
+        """
+        Create many documents concurrently with a pool of worker threads.
+        The documents iterable is consumed lazily, so that only a bounded number
+        of documents is in flight at any time.
+
+        :param documents: Iterable of dicts with the keyword arguments of create_document
+        :param workers: The number of documents created concurrently
+        :returns: A BatchResult with the created documents in input order and the
+          exceptions of failed documents, keyed by their index
+        """
+        result = BatchResult()
+
+        def create(kwargs):
+            return self.create_document(raw=raw, **kwargs)
+
+        def collect(index, future):
+            try:
+                result.add_result(future.result())
+            except Exception as exception:
+                result.add_error(index, exception)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for index, kwargs in enumerate(documents):
+                pending.append((index, executor.submit(create, kwargs)))
+                if len(pending) >= workers * 2:
+                    collect(*pending.popleft())
+
+            while pending:
+                collect(*pending.popleft())
 
-        return self.session().get(created_document.headers['Location']).json()
+        return result.finish()
 
     def sharing(self):
-        return self.session().get(f'{self.url}/@sharing').json()
+        return self._get_json(f'{self.url}/@sharing')
 
     def set_group_roles(self, name, roles):
         """
@@ -149,7 +452,8 @@ class GEVERClient:
             ],
         }
         response = self.session().post(f'{self.url}/@sharing', json=data)
+        self._invalidate_cache()
         return response.ok
 
     def group(self, name):
-        return self.session().get(f"{self.url}/@groups/{name}").json()
+        return self._get_json(f"{self.url}/@groups/{name}")
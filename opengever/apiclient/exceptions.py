@@ -26,6 +26,14 @@ class ServiceKeyMissing(APIException):
                          f'Found keys {known_key_urls} in paths {key_dirs}')
 
 
+class ChecksumMismatch(APIException):
+
+    def __init__(self, url, expected, got):
+        self.expected = expected
+        self.got = got
+        super().__init__(f'Checksum mismatch for {url}: expected {expected}, got {got}.')
+
+
 class APIRequestException(APIException):
     """Base class for exceptions when making a request to gever.
 
@@ -73,3 +81,24 @@ class AuthorizationFailed(APIRequestException):
         "An error occurred while acquiring the GEVER token. "
         "Maybe your API key is corrupt or invalid."
     )
+
+
+class CircuitOpen(APIRequestException):
+    default_message = "GEVER is unavailable, the request was not sent."
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        super().__init__(message=(
+            f"GEVER at {base_url} is unavailable after repeated failures, "
+            f"requests fail fast until it recovers."))
+
+    def __str__(self):
+        return self.message
+
+
+class NoRecordedResponse(APIException):
+
+    def __init__(self, method, url):
+        self.method = method
+        self.url = url
+        super().__init__(f'No recorded response for {method} {url}.')
@@ -0,0 +1,257 @@
+from bisect import bisect_left
+from collections import defaultdict
+from urllib.parse import urlsplit
+import threading
+import time
+
+import requests
+
+from .exceptions import APIRequestException
+
+
+def endpoint_template(url):
+    """Returns the endpoint of a request URL without the object path, e.g.
+    ``@listing``, ``@tus-upload`` or ``@@download``, so that the requests to
+    all objects are reported together. Plain object requests are reported as
+    ``object``.
+    """
+    for segment in urlsplit(url).path.split('/'):
+        if segment.startswith('@'):
+            return segment
+    return 'object'
+
+
+class RequestEvent:
+    """The measurements of one request, reported to the instrument.
+
+    The durations are in seconds: ``ttfb`` is the time until the response
+    headers were received and ``body`` the time reading the body afterwards
+    (None for streamed responses, which are read by the caller). ``duration``
+    and ``ttfb`` include retries. The connect time is not available from requests;
+    ``new_connection`` tells whether a connection was opened for the request.
+    ``status`` is None when no response was received.
+    """
+
+    __slots__ = ('base_url', 'endpoint', 'method', 'status', 'duration', 'ttfb',
+                 'body', 'bytes_sent', 'bytes_received', 'retries',
+                 'token_refreshed', 'new_connection')
+
+    def __init__(self, base_url, endpoint, method, status, duration, ttfb=None,
+                 body=None, bytes_sent=0, bytes_received=0, retries=0,
+                 token_refreshed=False, new_connection=False):
+        self.base_url = base_url
+        self.endpoint = endpoint
+        self.method = method
+        self.status = status
+        self.duration = duration
+        self.ttfb = ttfb
+        self.body = body
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.retries = retries
+        self.token_refreshed = token_refreshed
+        self.new_connection = new_connection
+
+
+class Instrument:
+    """An instrument receives a RequestEvent for every request of the sessions
+    it is configured for (see ``GEVERSession.instrument``).
+
+    It is called in the thread making the request and must be fast and
+    thread-safe.
+    """
+
+    def __call__(self, event):
+        raise NotImplementedError()
+
+
+class Histogram:
+    """A histogram with cumulative buckets, like Prometheus histograms.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self):
+        total = 0
+        for count in self.counts:
+            total += count
+            yield total
+
+
+class HistogramCollector(Instrument):
+    """Collects the request events in memory, as histograms of the durations
+    and counters, labeled by endpoint, method and status.
+    """
+
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    histograms = ('duration', 'ttfb', 'body')
+    counters = ('bytes_sent', 'bytes_received', 'retries', 'token_refreshed',
+                'new_connection')
+
+    def __init__(self, buckets=None):
+        if buckets is not None:
+            self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.series = defaultdict(self._make_series)
+
+    def _make_series(self):
+        series = {name: Histogram(self.buckets) for name in self.histograms}
+        series.update((name, 0) for name in self.counters)
+        return series
+
+    def __call__(self, event):
+        labels = (event.endpoint, event.method, str(event.status or ''))
+        with self._lock:
+            series = self.series[labels]
+            for name in self.histograms:
+                value = getattr(event, name)
+                if value is not None:
+                    series[name].observe(value)
+            for name in self.counters:
+                series[name] += int(getattr(event, name))
+
+    def prometheus(self, prefix='opengever_apiclient'):
+        """Returns the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            series = sorted(self.series.items())
+            lines = []
+            for name in self.histograms:
+                metric = f'{prefix}_request_{name}_seconds'
+                lines.append(f'# TYPE {metric} histogram')
+                for labels, values in series:
+                    histogram = values[name]
+                    label_text = _format_labels(labels)
+                    for bucket, count in zip(self.buckets, histogram.cumulative_counts()):
+                        lines.append(f'{metric}_bucket{{{label_text},le="{bucket}"}} {count}')
+                    lines.append(f'{metric}_bucket{{{label_text},le="+Inf"}} {histogram.count}')
+                    lines.append(f'{metric}_sum{{{label_text}}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{{label_text}}} {histogram.count}')
+
+            for name in self.counters:
+                metric = f'{prefix}_{name}_total'
+                lines.append(f'# TYPE {metric} counter')
+                for labels, values in series:
+                    lines.append(f'{metric}{{{_format_labels(labels)}}} {values[name]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    endpoint, method, status = (value.replace('\\', '\\\\').replace('"', '\\"')
+                                for value in labels)
+    return f'endpoint="{endpoint}",method="{method}",status="{status}"'
+
+
+class InstrumentedSession(requests.Session):
+    """A requests session reporting its requests to an instrument and writing
+    them to a recorder (see recording.Recorder).
+    Without an instrument and a recorder, requests are sent unchanged.
+
+    The session is shared by all GEVERSession instances and threads of a user,
+    therefore the instrument and the recorder are bound per thread with ``bind``
+    right before each request (see ``GEVERSession.__call__``).
+    """
+
+    # Set when a new token was set, reported by the next request.
+    token_refreshed = False
+
+    def __init__(self):
+        super().__init__()
+        self._bound = threading.local()
+
+    def bind(self, instrument, recorder):
+        """Use the instrument and the recorder for the requests of the current
+        thread.
+        """
+        self._bound.instrument = instrument
+        self._bound.recorder = recorder
+
+    def send(self, request, **kwargs):
+        instrument = getattr(self._bound, 'instrument', None)
+        recorder = getattr(self._bound, 'recorder', None)
+        if instrument is None and recorder is None:
+            return super().send(request, **kwargs)
+
+        token_refreshed = self.token_refreshed
+        self.token_refreshed = False
+        pool = self._connection_pool(request, kwargs) if instrument is not None else None
+        connections = pool.num_connections if pool is not None else 0
+
+        start = time.perf_counter()
+        response = None
+        completed = False
+        try:
+            response = super().send(request, **kwargs)
+            completed = True
+        except APIRequestException as exception:
+            response = getattr(exception.original_exception, 'response', None)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            if recorder is not None and response is not None:
+                recorder.record(request, response, duration)
+            if instrument is not None:
+                instrument(self._make_event(
+                    request, response, duration, completed and not kwargs.get('stream'),
+                    token_refreshed,
+                    pool is not None and pool.num_connections > connections))
+
+        return response
+
+    def _make_event(self, request, response, duration, body_read, token_refreshed,
+                    new_connection):
+        ttfb = body = None
+        bytes_received = 0
+        if response is not None:
+            ttfb = response.elapsed.total_seconds()
+            if body_read:
+                body = max(0.0, duration - ttfb)
+                bytes_received = len(response.content or b'')
+            else:
+                bytes_received = int(response.headers.get('Content-Length') or 0)
+
+        body_bytes = request.body
+        return RequestEvent(
+            base_url=getattr(self, 'gever_base_url', None),
+            endpoint=endpoint_template(request.url),
+            method=request.method,
+            status=response.status_code if response is not None else None,
+            duration=duration,
+            ttfb=ttfb,
+            body=body,
+            bytes_sent=len(body_bytes) if isinstance(body_bytes, (bytes, str)) else 0,
+            bytes_received=bytes_received,
+            retries=getattr(response, 'gever_retries', 0),
+            token_refreshed=token_refreshed,
+            new_connection=new_connection,
+        )
+
+    def _connection_pool(self, request, kwargs):
+        """Returns the urllib3 connection pool the adapter uses for the request.
+        """
+        try:
+            adapter = self.get_adapter(request.url)
+            if hasattr(adapter, 'get_connection_with_tls_context'):
+                return adapter.get_connection_with_tls_context(
+                    request, kwargs.get('verify', True), kwargs.get('proxies'),
+                    kwargs.get('cert'))
+            return adapter.get_connection(request.url, kwargs.get('proxies'))
+        except Exception:
+            return None
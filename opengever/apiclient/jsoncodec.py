@@ -0,0 +1,83 @@
+from functools import lru_cache
+import json
+import os
+
+
+class JSONCodec:
+    """The JSON codec decodes the responses of GEVER. This is the codec of the
+    standard library, which is always available.
+    """
+
+    name = 'json'
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(obj).encode('utf-8')
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec using orjson, which is several times faster than the standard
+    library.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj)
+
+
+class UjsonCodec(JSONCodec):
+    """Codec using ujson.
+    """
+
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+    def dumps(self, obj):
+        return self._ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+# The codecs by name, the fastest first.
+CODECS = {
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+    JSONCodec.name: JSONCodec,
+}
+
+
+def get_codec(name=None):
+    """Returns the codec with the name. Without a name, the codec configured with
+    the environment variable OPENGEVER_APICLIENT_JSON_CODEC is returned, or else
+    the fastest installed codec.
+    """
+    return _make_codec(name or os.environ.get('OPENGEVER_APICLIENT_JSON_CODEC'))
+
+
+@lru_cache(maxsize=None)
+def _make_codec(name):
+    if name:
+        if name not in CODECS:
+            raise ValueError(f'Unknown JSON codec {name!r}, '
+                             f'expected one of {", ".join(CODECS)}.')
+        return CODECS[name]()
+
+    for codec in CODECS.values():
+        try:
+            return codec()
+        except ImportError:
+            continue
@@ -1,7 +1,9 @@
+from opengever.apiclient import LOG
 from opengever.apiclient.utils import singleton
 from pathlib import Path
 import json
 import os
+import threading
 
 
 @singleton
@@ -9,30 +11,99 @@ class KeyRegistry:
     """The KeyRegistry stores loads the keys from the "keys" filesystem directory
     and stores them for later use.
     It loads all keys from directories configured in "OPENGEVER_APICLIENT_KEY_DIRS"
-    on process boot time.
+    when the keys are used for the first time. Changed key files can be reloaded incrementally with
+    ``reload``, or watched with ``watch``.
+
+    GEVER base URLs are looked up by the longest base URL which is a prefix of
+    the URL at a path boundary. Lookups are memoized until the keys change.
     """
 
+    # Maximum number of memoized URL lookups.
+    url_cache_size = 10000
+
     def __init__(self):
-        self.reset()
+        self._reload_lock = threading.RLock()
+        self._subscribers = []
+        self._keys = None
+        self._files = {}
+        self._base_url_cache = {}
+        self._signing_keys = {}
+
+    @property
+    def keys(self):
+        """The keys by GEVER base URL. The configured directories are loaded
+        on first access.
+        """
+        if self._keys is None:
+            with self._reload_lock:
+                if self._keys is None:
+                    self.reset()
+        return self._keys
+
+    @keys.setter
+    def keys(self, keys):
+        self._keys = keys
 
     def get_base_url_for(self, url):
         """Returns the GEVER client base url according to the known keys.
         """
-        for gever_base_url in sorted(self.keys.keys()):
-            if url.startswith(gever_base_url):
-                return gever_base_url
+        try:
+            return self._base_url_cache[url]
+        except KeyError:
+            pass
+
+        base_url = self._lookup_base_url(url)
+        if len(self._base_url_cache) >= self.url_cache_size:
+            self._base_url_cache = {}
+        self._base_url_cache[url] = base_url
+        return base_url
 
     def get_key_for(self, url):
         """Returns the GEVER service key matching the given URL.
         """
-        for gever_base_url, key in sorted(self.keys.items()):
-            if url.startswith(gever_base_url):
-                return key
+        gever_base_url = self.get_base_url_for(url)
+        if gever_base_url is not None:
+            return self.keys.get(gever_base_url)
+
+    def get_signing_key_for(self, url):
+        """Returns the private key object of the GEVER service key matching the
+        given URL, for signing JWT grants. The PEM is parsed once per key.
+        """
+        gever_base_url = self.get_base_url_for(url)
+        if gever_base_url is None or gever_base_url not in self.keys:
+            return None
+
+        signing_key = self._signing_keys.get(gever_base_url)
+        if signing_key is None:
+            from cryptography.hazmat.backends import default_backend
+            from cryptography.hazmat.primitives.serialization import load_pem_private_key
+            signing_key = load_pem_private_key(
+                self.keys[gever_base_url]['private_key'].encode('utf-8'),
+                password=None,
+                backend=default_backend())
+            self._signing_keys[gever_base_url] = signing_key
+        return signing_key
+
+    def _lookup_base_url(self, url):
+        """Returns the longest known base URL which is a prefix of the URL.
+        Base URLs end with a slash (they are derived from the token URI), therefore
+        only the prefixes of the URL up to a slash are candidates, longest first.
+        """
+        position = len(url)
+        while True:
+            position = url.rfind('/', 0, position)
+            if position == -1:
+                return None
+            if url[:position + 1] in self.keys:
+                return url[:position + 1]
 
     def clear(self):
         """Clear all keys from the registry.
         """
         self.keys = {}
+        self._files = {}
+        self._base_url_cache = {}
+        self._signing_keys = {}
 
     def reset(self):
         """Clear the keys registry and load the keys from the configured directories.
@@ -55,13 +126,127 @@ class KeyRegistry:
     def load_keys(self, directory):
         """Load keys of a specific directory.
         """
-        for key in self._iter_keys(directory):
-            if "token_uri" not in key:
-                continue
+        for key_file in Path(directory).glob("*.json"):
+            gever_base_url = self._load_key_file(key_file, self.keys, self._files)
+            self._signing_keys.pop(gever_base_url, None)
+
+        self._base_url_cache = {}
+
+    def reload(self):
+        """Reload the key files of the configured directories which were added,
+        changed or removed since they were loaded, detected by their modification
+        time and size. The keys are swapped atomically and the subscribers are
+        notified with the affected base URLs, which are returned.
+        Files which cannot be read are logged and tried again on the next reload.
+        """
+        with self._reload_lock:
+            keys = dict(self.keys)
+            files = dict(self._files)
+            changed = set()
+            # Base URLs of changed or removed files, dropped unless another file
+            # provides them, e.g. when a key is rotated into a new file.
+            replaced = set()
+            directories = {Path(directory) for directory in self.get_key_dirs()}
+            seen = set()
+            for directory in directories:
+                for key_file in directory.glob("*.json"):
+                    seen.add(str(key_file))
+                    known = files.get(str(key_file))
+                    loaded = {}
+                    try:
+                        stat = key_file.stat()
+                        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                            continue
+                        gever_base_url = self._load_key_file(key_file, loaded, files)
+                    except (OSError, ValueError) as exc:
+                        LOG.exception(f'Could not reload the key file {key_file}: {exc}')
+                        continue
+
+                    if known and known[2]:
+                        replaced.add(known[2])
+                    keys.update(loaded)
+                    if gever_base_url:
+                        changed.add(gever_base_url)
+
+            for path in list(files):
+                if path not in seen and Path(path).parent in directories:
+                    gever_base_url = files.pop(path)[2]
+                    if gever_base_url:
+                        replaced.add(gever_base_url)
+
+            provided = {state[2] for state in files.values()}
+            for gever_base_url in replaced - provided:
+                keys.pop(gever_base_url, None)
+            changed.update(replaced)
+
+            self._files = files
+            if not changed:
+                return changed
+
+            for gever_base_url in changed:
+                self._signing_keys.pop(gever_base_url, None)
+            self.keys = keys
+            self._base_url_cache = {}
+
+        for subscriber in self._subscribers:
+            subscriber(changed)
+        return changed
+
+    def subscribe(self, subscriber):
+        """Register a callable, which is called with the set of affected base URLs
+        whenever reload changes keys.
+        """
+        self._subscribers.append(subscriber)
+
+    def watch(self, interval=10):
+        """Start watching the configured directories for changed key files in a
+        background thread, reloading them every interval seconds.
+        Returns the started KeyWatcher.
+        """
+        return KeyWatcher(self, interval).start()
 
+    def _load_key_file(self, key_file, keys, files):
+        """Read a key file into keys, record its state in files and return its
+        GEVER base URL, if it is valid. Nothing is changed when it cannot be read.
+        """
+        stat = key_file.stat()
+        key = json.loads(key_file.read_text())
+        gever_base_url = None
+        if "token_uri" in key:
             gever_base_url = key["token_uri"].replace("@@oauth2-token", "")
-            self.keys[gever_base_url] = key
+            keys[gever_base_url] = key
 
-    def _iter_keys(self, directory):
-        for key_file in Path(directory).glob("*.json"):
-            yield json.loads(key_file.read_text())
+        files[str(key_file)] = (stat.st_mtime_ns, stat.st_size, gever_base_url)
+        return gever_base_url
+
+
+class KeyWatcher:
+    """Reloads the changed key files of a key registry periodically in a
+    background thread.
+    """
+
+    def __init__(self, registry, interval):
+        self.registry = registry
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='gever-key-watcher',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.registry.reload()
+            except Exception as exc:
+                LOG.exception(exc)
@@ -0,0 +1,209 @@
+import json
+import sqlite3
+import time
+
+
+class Mirror:
+    """The mirror keeps the metadata of the objects below a GEVER URL in a local
+    SQLite file, so that reports can query it locally.
+
+    ``sync()`` pulls only the objects modified since the last sync (the
+    watermark) with batched @search requests. Deleted objects cannot be found
+    that way; ``reconcile()`` removes them by comparing the UIDs of the mirror
+    with the UIDs in GEVER, which is cheap because only UIDs are requested.
+    ``sync()`` reconciles when the last reconciliation is older than
+    reconcile_interval seconds. A full sync reconciles on the way.
+
+    The objects are stored in the table ``objects``, keyed by UID and unique by
+    URL, with indexed columns for the portal type, modification date and review
+    state, and the catalog metadata as JSON in ``data``.
+    """
+
+    batch_size = 500
+    reconcile_batch_size = 1000
+    reconcile_interval = 24 * 60 * 60
+
+    def __init__(self, client, path, portal_types=None):
+        """
+        :param client: The GEVERClient of the URL to mirror.
+        :param path: The path of the SQLite file.
+        :param portal_types: Mirror only objects of these portal types.
+        """
+        self.client = client
+        self.path = str(path)
+        self.portal_types = list(portal_types) if portal_types else None
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self._setup()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _setup(self):
+        with self.connection:
+            self.connection.executescript(
+                'CREATE TABLE IF NOT EXISTS objects ('
+                ' uid TEXT PRIMARY KEY,'
+                ' url TEXT NOT NULL UNIQUE,'
+                ' portal_type TEXT NOT NULL,'
+                ' title TEXT,'
+                ' modified TEXT,'
+                ' review_state TEXT,'
+                ' data TEXT NOT NULL);'
+                'CREATE INDEX IF NOT EXISTS objects_portal_type ON objects (portal_type);'
+                'CREATE INDEX IF NOT EXISTS objects_modified ON objects (modified);'
+                'CREATE INDEX IF NOT EXISTS objects_review_state ON objects (review_state);'
+                'CREATE TABLE IF NOT EXISTS state ('
+                ' name TEXT PRIMARY KEY,'
+                ' value TEXT NOT NULL);')
+
+    def _get_state(self, name):
+        row = self.connection.execute(
+            'SELECT value FROM state WHERE name = ?', (name,)).fetchone()
+        return row['value'] if row else None
+
+    def _set_state(self, name, value):
+        self.connection.execute(
+            'INSERT OR REPLACE INTO state (name, value) VALUES (?, ?)', (name, str(value)))
+
+    @property
+    def watermark(self):
+        """The modification date of the most recently modified object synced.
+        """
+        return self._get_state('watermark')
+
+    def _search(self, batch_size, key, start=None, **params):
+        """Yield the batches of a @search below the client URL, sorted by the
+        date key and starting at the date start.
+
+        The batches are paged by key instead of by offset, so that objects which
+        are deleted or modified meanwhile do not shift the objects not seen yet:
+        each batch is searched from the date of the last object seen, skipping
+        the objects of that date seen already. Only when a whole batch has the
+        same date, the next batch continues at an offset within that date.
+        """
+        params.update({'b_size:int': batch_size, 'sort_on': key})
+        if self.portal_types:
+            params['portal_type:list'] = self.portal_types
+
+        cursor = start
+        seen = set()  # The UIDs of the objects of the cursor date.
+        b_start = 0
+        while True:
+            if cursor is not None:
+                params.update({f'{key}.query': cursor, f'{key}.range': 'min'})
+            params['b_start:int'] = b_start
+            response = self.client.session.decode(self.client.session().get(
+                f'{self.client.url}/@search', params=params))
+            items = response.get('items', [])
+            new_items = [item for item in items if item['UID'] not in seen]
+            if new_items:
+                yield new_items
+            if not items or b_start + len(items) >= response.get('items_total', 0):
+                return
+
+            last = items[-1].get(key)
+            if last is None or last == cursor:
+                b_start += len(items)
+            else:
+                cursor = last
+                b_start = 0
+                seen = set()
+            seen.update(item['UID'] for item in items if item.get(key) == cursor)
+
+    def sync(self, full=False):
+        """Pull the objects modified since the watermark into the mirror and
+        reconcile deletions when they are due.
+
+        :param full: Pull all objects, ignoring the watermark.
+        :returns: A dict with the number of objects "pulled" and "deleted".
+        """
+        # Objects modified at the watermark itself are pulled again, so that
+        # none modified within the same second are missed.
+        watermark = None if full else self.watermark
+        pulled = 0
+        uids = set()
+        for items in self._search(self.batch_size, 'modified', start=watermark,
+                                  **{'metadata_fields:list': ['_all']}):
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO objects'
+                    ' (uid, url, portal_type, title, modified, review_state, data)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [(item['UID'], item['@id'].rstrip('/'), item['@type'], item.get('title'),
+                      item.get('modified'), item.get('review_state'), json.dumps(item))
+                     for item in items])
+                # The batches are sorted by modification date.
+                if items[-1].get('modified'):
+                    self._set_state('watermark', items[-1]['modified'])
+            pulled += len(items)
+            uids.update(item['UID'] for item in items)
+
+        if watermark is None:
+            # A full sync has seen all objects, which reconciles the mirror.
+            return {'pulled': pulled, 'deleted': self._remove_missing(uids)}
+
+        deleted = 0
+        last_reconciliation = float(self._get_state('reconciled') or 0)
+        if time.time() - last_reconciliation >= self.reconcile_interval:
+            deleted = self.reconcile()
+        return {'pulled': pulled, 'deleted': deleted}
+
+    def reconcile(self):
+        """Remove the objects which no longer exist in GEVER from the mirror.
+
+        :returns: The number of removed objects.
+        """
+        uids = set()
+        # Sorted by creation, so that objects modified meanwhile keep their position.
+        for items in self._search(self.reconcile_batch_size, 'created',
+                                  **{'metadata_fields:list': ['UID', 'created']}):
+            uids.update(item['UID'] for item in items)
+        return self._remove_missing(uids)
+
+    def _remove_missing(self, uids):
+        """Remove the objects whose UIDs are not in uids and record the
+        reconciliation. Returns the number of removed objects.
+        """
+        stale = [row['uid'] for row in self.connection.execute('SELECT uid FROM objects')
+                 if row['uid'] not in uids]
+        with self.connection:
+            self.connection.executemany('DELETE FROM objects WHERE uid = ?',
+                                        [(uid,) for uid in stale])
+            self._set_state('reconciled', time.time())
+        return len(stale)
+
+    def get(self, uid=None, url=None):
+        """Returns the metadata of the object with the UID or URL, or None.
+        """
+        if uid is not None:
+            row = self.connection.execute(
+                'SELECT data FROM objects WHERE uid = ?', (uid,)).fetchone()
+        else:
+            row = self.connection.execute(
+                'SELECT data FROM objects WHERE url = ?', (url.rstrip('/'),)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def objects(self, portal_type=None, review_state=None):
+        """Yield the metadata of the mirrored objects, optionally filtered by
+        portal type and review state, ordered by modification date.
+        """
+        query = 'SELECT data FROM objects'
+        conditions = []
+        params = []
+        if portal_type is not None:
+            conditions.append('portal_type = ?')
+            params.append(portal_type)
+        if review_state is not None:
+            conditions.append('review_state = ?')
+            params.append(review_state)
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        for row in self.connection.execute(query + ' ORDER BY modified', params):
+            yield json.loads(row['data'])
@@ -1,3 +1,4 @@
 from .document import Document  # noqa
+from .dossier import Dossier  # noqa
 from .repository_folder import RepositoryFolder  # noqa
 from .registry import ModelRegistry  # noqa
@@ -1,24 +1,61 @@
 from urllib.parse import urljoin
+import sys
 
 from .registry import ModelRegistry
 
 
+# Keys which are kept by a column projection in any case.
+REQUIRED_KEYS = ('@id', '@type')
+
+
 class APIModel:
+    """Base class of the models wrapping the items returned by GEVER.
+
+    Models are slotted and intern the keys of their item, so that many of them
+    can be kept in memory. The nested ``parent`` and ``items`` are wrapped on
+    first access and cached until the item is updated, as are the decoded values
+    of the typed fields (see ``Field``) declared by the models.
+    Subclasses must declare ``__slots__`` as well.
+    """
+
+    __slots__ = ('raw', '_client', '_parent_client', '_cache')
+
+    # The name of the listing of this type and the columns requested by
+    # default from that listing.
+    listing_name = None
+    listing_columns = ()
 
-    def __init__(self, raw, client):
+    def __init__(self, raw, client, columns=None):
+        """
+        :param raw: The item (dict) returned by GEVER.
+        :param client: The client which wraps the item.
+        :param columns: Optional names of the keys to keep of the item, the
+          others are dropped. ``@id`` and ``@type`` are always kept.
+        """
         if not isinstance(raw, dict):
             raise ValueError(f'Expected dict, got {type(raw).__name__}')
         if not raw.get('@type'):
             raise ValueError(f'Missing @type in raw.')
         if self.portal_type not in (raw['@type'], '_unknown_'):
             raise ValueError(f'Invalid portal_type {raw["@type"]} for {type(self)!r}')
-        self.client = client.adopt(raw['@id'])
-        self.update_item(raw)
+        self._client = None
+        self._parent_client = client
+        if not client.lazy_models:
+            self._client = client.adopt(raw['@id'])
+        self.update_item(raw, columns)
 
-    def update_item(self, raw):
-        self.raw = raw
+    def update_item(self, raw, columns=None):
+        if columns is not None:
+            keep = set(columns).union(REQUIRED_KEYS)
+            self.raw = {sys.intern(key): value for key, value in raw.items() if key in keep}
+        else:
+            self.raw = {sys.intern(key): value for key, value in raw.items()}
+        self._cache = {}
 
     def __getattr__(self, name):
+        # Slots are only missing before __init__ has set them.
+        if name in APIModel.__slots__:
+            raise AttributeError(name)
         if name in self.raw:
             return self.raw.get(name)
         elif hasattr(super(), name):
@@ -30,6 +67,14 @@ class APIModel:
     def __eq__(self, other):
         return self.url == other.url
 
+    @property
+    def client(self):
+        """The client of this item, adopted from the client which has wrapped it.
+        """
+        if self._client is None:
+            self._client = self._parent_client.adopt(self.url)
+        return self._client
+
     @property
     def url(self):
         return self.raw['@id']
@@ -38,24 +83,54 @@ class APIModel:
     def parent(self):
         """Parent object.
         """
-        return self.client.wrap(self.raw['parent'])
+        if 'parent' not in self._cache:
+            self._cache['parent'] = self.client.wrap(self.raw['parent'])
+        return self._cache['parent']
 
     @property
     def items(self):
         """The children of the object.
+        The list is cached, it must not be modified.
         """
-        return list(map(self.client.wrap, self.raw['items']))
+        if 'items' not in self._cache:
+            self._cache['items'] = list(map(self.client.wrap, self.raw['items']))
+        return self._cache['items']
+
+    def _require_sync_client(self, name):
+        """Raise a TypeError when the model is bound to an async client, which
+        cannot be used by the synchronous method name.
+        """
+        if getattr(self._parent_client, 'is_async', False):
+            alternative = f', use a{name} instead' if hasattr(type(self), f'a{name}') else ''
+            raise TypeError(
+                f'{type(self).__name__}.{name} cannot be used with an '
+                f'{type(self._parent_client).__name__}{alternative}.')
 
     def fetch(self):
         """Fetch this item from GEVER and update self.
         """
+        self._require_sync_client('fetch')
         self.update_item(self.client.fetch(raw=True))
         return self
 
+    async def afetch(self):
+        """Fetch this item from GEVER with the async client and update self.
+        """
+        self.update_item(await self.client.fetch(raw=True))
+        return self
+
     def has_addable_type(self, content_type):
+        self._require_sync_client('has_addable_type')
         # Why the trailing slash?
         # https://stackoverflow.com/a/10893427/3906189
-        types = self.client.session().get(urljoin(f'{self.url}/', '@types')).json()
+        response = self.client.session().get(urljoin(f'{self.url}/', '@types'))
+        return self._is_addable(self.client.session.decode(response), content_type)
+
+    async def ahas_addable_type(self, content_type):
+        types = await self.client._request_json('GET', urljoin(f'{self.url}/', '@types'))
+        return self._is_addable(types, content_type)
+
+    def _is_addable(self, types, content_type):
         for gever_content_type in types:
             if gever_content_type['@id'].endswith(content_type):
                 return gever_content_type['addable']
@@ -64,4 +139,5 @@ class APIModel:
 
 @ModelRegistry.register
 class BaseModel(APIModel):
+    __slots__ = ()
     portal_type = '_unknown_'
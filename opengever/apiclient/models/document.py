@@ -1,7 +1,137 @@
+from pathlib import Path
+import hashlib
+
+from requests.exceptions import RequestException
+
+from ..exceptions import APIRequestException
+from ..exceptions import ChecksumMismatch
 from .base import APIModel
+from .fields import Field
+from .fields import parse_datetime
+from .fields import token
 from .registry import ModelRegistry
 
 
 @ModelRegistry.register
 class Document(APIModel):
+    __slots__ = ()
     portal_type = 'opengever.document.document'
+
+    listing_name = 'documents'
+    listing_columns = ('title', 'created', 'modified', 'filename',
+                       'file_extension', 'checked_out')
+
+    created = Field(parse_datetime)
+    modified = Field(parse_datetime)
+    document_date = Field(parse_datetime)
+    classification = Field(token)
+    file_size = Field(lambda file: file.get('size'), key='file')
+
+    download_chunk_size = 64 * 1024
+    download_retries = 3
+
+    @property
+    def download_url(self):
+        """The URL for downloading the file of the document.
+        Partial items (e.g. from listings) are fetched when they have no file infos.
+        """
+        if 'file' not in self.raw:
+            self.fetch()
+        if not self.raw.get('file'):
+            raise ValueError(f'The document {self.url} has no file.')
+        return self.raw['file']['download']
+
+    def iter_content(self, chunk_size=None, offset=0):
+        """Iterate over the file content of the document in chunks, streamed through
+        the authenticated session.
+        When the connection breaks, the download is resumed with an HTTP Range
+        request, up to download_retries times.
+
+        :param chunk_size: The size of the chunks, defaults to download_chunk_size
+        :param offset: The number of bytes to skip at the beginning of the file
+        """
+        self._require_sync_client('iter_content')
+        chunk_size = chunk_size or self.download_chunk_size
+        url = self.download_url
+        if offset and offset == self.raw['file'].get('size'):
+            return
+        received = offset
+        attempts = 0
+        while True:
+            headers = {'Accept': '*/*'}
+            if received:
+                headers['Range'] = f'bytes={received}-'
+
+            try:
+                with self.client.session().get(url, headers=headers, stream=True) as response:
+                    # Servers ignoring the Range header send the whole file.
+                    skip = received if response.status_code != 206 else 0
+                    for chunk in response.iter_content(chunk_size):
+                        if skip:
+                            skipped = min(skip, len(chunk))
+                            chunk = chunk[skipped:]
+                            skip -= skipped
+                            if not chunk:
+                                continue
+                        received += len(chunk)
+                        yield chunk
+                return
+            except APIRequestException as exception:
+                if received and self._range_is_complete(exception, received):
+                    return
+                raise
+            except RequestException:
+                attempts += 1
+                if attempts > self.download_retries:
+                    raise
+
+    def _range_is_complete(self, exception, received):
+        """Whether a ranged request failed because the file has no bytes after
+        the received ones (416 Range Not Satisfiable).
+        """
+        response = getattr(exception.original_exception, 'response', None)
+        if response is None or response.status_code != 416:
+            return False
+        # The size of the file is reported as "bytes */<size>", when known.
+        content_range = response.headers.get('Content-Range', '')
+        size = content_range.rpartition('/')[2]
+        return not size.isdigit() or int(size) == received
+
+    def download(self, to, chunk_size=None, checksum=None, algorithm='sha256', resume=False):
+        """Download the file of the document without loading it into memory.
+
+        :param to: A path or a writable binary IO
+        :param chunk_size: The size of the chunks, defaults to download_chunk_size
+        :param checksum: Optional hex digest to verify the downloaded content with,
+          e.g. the ``bumblebee_checksum`` of the document (sha256)
+        :param algorithm: The hashlib algorithm of the checksum
+        :param resume: When downloading to a path which already exists, continue
+          after its content with an HTTP Range request instead of starting over
+        :returns: The number of bytes of the file
+        """
+        self._require_sync_client('download')
+        if not hasattr(to, 'write'):
+            path = Path(to)
+            offset = path.stat().st_size if resume and path.exists() else 0
+            with path.open('ab' if offset else 'wb') as file:
+                return self._download(file, chunk_size, checksum, algorithm, offset, path)
+
+        return self._download(to, chunk_size, checksum, algorithm, 0, None)
+
+    def _download(self, file, chunk_size, checksum, algorithm, offset, path):
+        digest = hashlib.new(algorithm) if checksum else None
+        if digest and offset:
+            with path.open('rb') as existing:
+                for chunk in iter(lambda: existing.read(self.download_chunk_size), b''):
+                    digest.update(chunk)
+
+        size = offset
+        for chunk in self.iter_content(chunk_size, offset=offset):
+            file.write(chunk)
+            size += len(chunk)
+            if digest:
+                digest.update(chunk)
+
+        if digest and digest.hexdigest() != checksum:
+            raise ChecksumMismatch(self.url, checksum, digest.hexdigest())
+        return size
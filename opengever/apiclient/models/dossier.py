@@ -0,0 +1,22 @@
+from .base import APIModel
+from .fields import Field
+from .fields import parse_date
+from .fields import parse_datetime
+from .fields import token
+from .registry import ModelRegistry
+
+
+@ModelRegistry.register
+class Dossier(APIModel):
+    __slots__ = ()
+    portal_type = 'opengever.dossier.businesscasedossier'
+
+    listing_name = 'dossiers'
+    listing_columns = ('title', 'reference', 'review_state', 'responsible',
+                       'start', 'end', 'modified')
+
+    created = Field(parse_datetime)
+    modified = Field(parse_datetime)
+    start = Field(parse_date)
+    end = Field(parse_date)
+    responsible = Field(token)
@@ -0,0 +1,66 @@
+from datetime import date
+from datetime import datetime
+
+
+def parse_datetime(value):
+    """Decode an ISO 8601 timestamp, e.g. "2016-08-31T14:07:33+00:00".
+    """
+    if value.endswith('Z'):
+        value = f'{value[:-1]}+00:00'
+    return datetime.fromisoformat(value)
+
+
+def parse_date(value):
+    """Decode an ISO 8601 date, ignoring a time part.
+    """
+    return date.fromisoformat(value[:10])
+
+
+def token(value):
+    """Decode a vocabulary term (dict with token and title) into its token.
+    Listings return plain tokens, which are kept.
+    """
+    if isinstance(value, dict):
+        return value.get('token')
+    return value
+
+
+class Field:
+    """A typed field of a model, decoding the value of a key of the item.
+
+    The value is decoded on first access and cached until the item is updated.
+    None is not decoded. When the item has no such key (e.g. partial items of
+    a listing), an AttributeError is raised like for any missing attribute.
+    """
+
+    def __init__(self, decoder, key=None):
+        """
+        :param decoder: A callable decoding the raw value.
+        :param key: The key in the item, defaults to the attribute name.
+        """
+        self.decoder = decoder
+        self.key = key
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        if self.key is None:
+            self.key = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        cache = instance._cache
+        if self in cache:
+            return cache[self]
+
+        if self.key not in instance.raw:
+            raise AttributeError(
+                f'{type(instance).__name__} object has no attribute {self.name}')
+
+        value = instance.raw[self.key]
+        if value is not None:
+            value = self.decoder(value)
+        cache[self] = value
+        return value
@@ -21,8 +21,18 @@ class ModelRegistry:
         """
         return self.models.get(portal_type, *args, **kwargs)
 
-    def wrap(self, item, client):
+    def listing_columns(self, name):
+        """Returns the default columns of the listing with this name, declared
+        by the model of its type, or an empty list.
+        """
+        for model in self.models.values():
+            if model.listing_name == name:
+                return list(model.listing_columns)
+        return []
+
+    def wrap(self, item, client, columns=None):
         """Wrap an item (dict from GEVER) into an object based on our models.
+        When columns are passed, only these keys of the item are kept.
         """
         if not isinstance(item, dict):
             raise ValueError(f'Expected dict, got {type(item).__name__}')
@@ -30,4 +40,4 @@ class ModelRegistry:
             raise ValueError(f'Missing @type in item.')
 
         model = self.get(item.get('@type')) or self.get('_unknown_')
-        return model(item, client)
+        return model(item, client, columns)
@@ -1,7 +1,13 @@
 from .base import APIModel
+from .fields import Field
+from .fields import parse_datetime
 from .registry import ModelRegistry
 
 
 @ModelRegistry.register
 class RepositoryFolder(APIModel):
+    __slots__ = ()
     portal_type = 'opengever.repository.repositoryfolder'
+
+    created = Field(parse_datetime)
+    modified = Field(parse_datetime)
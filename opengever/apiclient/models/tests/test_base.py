@@ -1,3 +1,5 @@
+import sys
+
 from ... import GEVERClient
 from ...tests import TestCase
 from ..base import APIModel
@@ -40,3 +42,60 @@ class TestAPIModel(TestCase):
         repository_folder = GEVERClient(self.repository_folder_url, self.regular_user).fetch()
         self.assertTrue(repository_folder.has_addable_type('opengever.dossier.businesscasedossier'))
         self.assertFalse(repository_folder.has_addable_type('opengever.repository.repositoryfolder'))
+
+    def test_client_is_adopted_for_the_item(self):
+        document = GEVERClient(self.dossier_url, self.regular_user).wrap(
+            {'@id': self.document_url, '@type': 'opengever.document.document'})
+        self.assertEqual(self.document_url, document.client.url)
+
+    def test_lazy_models_adopt_client_on_first_use(self):
+        client = GEVERClient(self.dossier_url, self.regular_user, lazy_models=True)
+        document = client.wrap({'@id': self.document_url, '@type': 'opengever.document.document'})
+        self.assertIsNone(document._client)
+
+        self.assertEqual(self.document_url, document.client.url)
+        self.assertIs(document.client, document.client)
+        self.assertIs(client.session, document.client.session)
+
+    def test_models_have_no_instance_dict(self):
+        document = GEVERClient(self.dossier_url, self.regular_user).wrap(
+            {'@id': self.document_url, '@type': 'opengever.document.document'})
+        self.assertFalse(hasattr(document, '__dict__'))
+        with self.assertRaises(AttributeError):
+            document.foo = 'bar'
+
+    def test_column_projection(self):
+        client = GEVERClient(self.dossier_url, self.regular_user, lazy_models=True)
+        document = client.wrap({'@id': self.document_url,
+                                '@type': 'opengever.document.document',
+                                'title': 'Vertrag',
+                                'description': 'Wichtig'},
+                               columns=['title'])
+        self.assertEqual({'@id': self.document_url,
+                          '@type': 'opengever.document.document',
+                          'title': 'Vertrag'}, document.raw)
+
+    def test_keys_are_interned(self):
+        client = GEVERClient(self.dossier_url, self.regular_user, lazy_models=True)
+        key = ''.join(['ti', 'tle'])
+        document = client.wrap({'@id': self.document_url,
+                                '@type': 'opengever.document.document',
+                                key: 'Vertrag'})
+        self.assertIs(sys.intern('title'), next(k for k in document.raw if k == 'title'))
+
+    def test_parent_and_items_are_cached(self):
+        client = GEVERClient(self.dossier_url, self.regular_user, lazy_models=True)
+        dossier = client.wrap({
+            '@id': self.dossier_url,
+            '@type': 'opengever.dossier.businesscasedossier',
+            'parent': {'@id': self.repository_folder_url,
+                       '@type': 'opengever.repository.repositoryfolder'},
+            'items': [{'@id': self.document_url, '@type': 'opengever.document.document'}]})
+        self.assertIs(dossier.parent, dossier.parent)
+        self.assertIs(dossier.items, dossier.items)
+        self.assertEqual(self.document_url, dossier.items[0].url)
+
+        dossier.update_item({'@id': self.dossier_url,
+                             '@type': 'opengever.dossier.businesscasedossier',
+                             'items': []})
+        self.assertEqual([], dossier.items)
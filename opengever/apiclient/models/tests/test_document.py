@@ -1,5 +1,17 @@
+from datetime import datetime
+from datetime import timezone
+from io import BytesIO
+from pathlib import Path
+import hashlib
+import tempfile
+
+import requests
+import requests_mock
+
 from .. import Document
+from .. import ModelRegistry
 from ... import GEVERClient
+from ...exceptions import ChecksumMismatch
 from ...tests import TestCase
 
 
@@ -9,7 +21,7 @@ class TestDocumentModel(TestCase):
         document = GEVERClient(self.document_url, self.regular_user).fetch()
         self.assertIsInstance(document, Document)
         self.assertEqual('Verträgsentwurf', document.title)
-        self.assertEqual('2016-08-31T14:07:33+00:00', document.created)
+        self.assertEqual(datetime(2016, 8, 31, 14, 7, 33, tzinfo=timezone.utc), document.created)
 
     def test_raw(self):
         document = GEVERClient(self.document_url, self.regular_user).fetch()
@@ -54,3 +66,115 @@ class TestDocumentModel(TestCase):
     def test_url(self):
         document = GEVERClient(self.document_url, self.regular_user ).fetch()
         self.assertEqual(self.document_url, document.url)
+
+
+class TestDocumentDownload(TestCase):
+
+    def create_document(self, content=b'content of the document'):
+        return GEVERClient(self.dossier_url, self.regular_user).create_document(
+            title='Ein Dokument',
+            file=BytesIO(content),
+            content_type='text/plain',
+            filename='Ein Dokument.txt',
+            size=len(content),
+        )
+
+    def test_iter_content(self):
+        document = self.create_document()
+        self.assertEqual([b'content ', b'of the d', b'ocument'],
+                         list(document.iter_content(chunk_size=8)))
+
+    def test_download_to_file(self):
+        document = self.create_document()
+        output = BytesIO()
+        self.assertEqual(23, document.download(output))
+        self.assertEqual(b'content of the document', output.getvalue())
+
+    def test_download_to_path(self):
+        document = self.create_document()
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'document.txt'
+            document.download(str(path))
+            self.assertEqual(b'content of the document', path.read_bytes())
+
+    def test_download_fetches_partial_items(self):
+        document = self.create_document()
+        partial = ModelRegistry.wrap(
+            {'@id': document.url, '@type': 'opengever.document.document'},
+            GEVERClient(self.dossier_url, self.regular_user))
+        self.assertEqual(b'content of the document', b''.join(partial.iter_content()))
+
+    def test_download_verifies_checksum(self):
+        document = self.create_document()
+        checksum = hashlib.sha256(b'content of the document').hexdigest()
+        document.download(BytesIO(), checksum=checksum)
+
+        with self.assertRaises(ChecksumMismatch):
+            document.download(BytesIO(), checksum=hashlib.sha256(b'other').hexdigest())
+
+
+class TestDocumentDownloadResume(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mocker = requests_mock.Mocker()
+        self.mocker.start()
+        self.addCleanup(self.mocker.stop)
+        self.mocker.post(f'{self.plone_url}@@oauth2-token', json={'access_token': 'token'})
+        self.download_url = f'{self.document_url}/@@download/file'
+        self.document = ModelRegistry.wrap(
+            {'@id': self.document_url,
+             '@type': 'opengever.document.document',
+             'file': {'download': self.download_url}},
+            GEVERClient(self.document_url, self.regular_user))
+
+    def respond_with_range(self, request, context):
+        content = b'content of the document'
+        if 'Range' not in request.headers:
+            return content
+
+        context.status_code = 206
+        start = int(request.headers['Range'][len('bytes='):-1])
+        return content[start:]
+
+    def test_resumes_existing_file_with_range_request(self):
+        self.mocker.get(self.download_url, content=self.respond_with_range)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'document.txt'
+            path.write_bytes(b'content of')
+            checksum = hashlib.sha256(b'content of the document').hexdigest()
+            self.assertEqual(23, self.document.download(path, resume=True, checksum=checksum))
+            self.assertEqual(b'content of the document', path.read_bytes())
+
+        self.assertEqual('bytes=10-', self.mocker.last_request.headers['Range'])
+
+    def test_resuming_a_complete_file_verifies_it(self):
+        self.mocker.get(self.download_url, status_code=416,
+                        headers={'Content-Range': 'bytes */23'})
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'document.txt'
+            path.write_bytes(b'content of the document')
+            checksum = hashlib.sha256(b'content of the document').hexdigest()
+            with self.assertLogs(level='ERROR'):
+                self.assertEqual(23, self.document.download(path, resume=True,
+                                                            checksum=checksum))
+            with self.assertLogs(level='ERROR'), self.assertRaises(ChecksumMismatch):
+                self.document.download(path, resume=True, checksum='abc')
+
+    def test_resuming_a_file_of_known_size_skips_the_request(self):
+        self.document.raw['file']['size'] = 23
+        self.assertEqual([], list(self.document.iter_content(offset=23)))
+        self.assertEqual(1, self.mocker.call_count)
+
+    def test_skips_received_bytes_when_range_is_not_supported(self):
+        self.mocker.get(self.download_url, content=b'content of the document')
+        self.assertEqual([b' the document'],
+                         list(self.document.iter_content(offset=10)))
+
+    def test_retries_when_connection_fails(self):
+        self.mocker.get(self.download_url, [
+            {'exc': requests.exceptions.ConnectionError},
+            {'content': b'content of the document'},
+        ])
+        self.assertEqual(b'content of the document', b''.join(self.document.iter_content()))
+        self.assertEqual(2, self.mocker.call_count - 1)
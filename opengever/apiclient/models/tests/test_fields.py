@@ -0,0 +1,88 @@
+from datetime import date
+from datetime import datetime
+from datetime import timezone
+
+from .. import Document
+from .. import Dossier
+from .. import ModelRegistry
+from ... import GEVERClient
+from ...tests import TestCase
+from ..fields import parse_date
+from ..fields import parse_datetime
+from ..fields import token
+
+
+class TestFieldDecoders(TestCase):
+
+    def test_parse_datetime(self):
+        self.assertEqual(datetime(2016, 8, 31, 14, 7, 33, tzinfo=timezone.utc),
+                         parse_datetime('2016-08-31T14:07:33+00:00'))
+        self.assertEqual(datetime(2016, 8, 31, 14, 7, 33, tzinfo=timezone.utc),
+                         parse_datetime('2016-08-31T14:07:33Z'))
+        self.assertEqual(datetime(2010, 1, 3), parse_datetime('2010-01-03T00:00:00'))
+
+    def test_parse_date(self):
+        self.assertEqual(date(2016, 1, 1), parse_date('2016-01-01'))
+        self.assertEqual(date(2016, 1, 1), parse_date('2016-01-01T00:00:00'))
+
+    def test_token(self):
+        self.assertEqual('unprotected', token({'title': 'Nicht klassifiziert',
+                                               'token': 'unprotected'}))
+        self.assertEqual('kathi.barfuss', token('kathi.barfuss'))
+
+
+class TestTypedFields(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = GEVERClient(self.dossier_url, self.regular_user, lazy_models=True)
+
+    def wrap_document(self, **data):
+        return self.client.wrap({'@id': self.document_url,
+                                 '@type': 'opengever.document.document',
+                                 **data})
+
+    def test_fields_are_decoded(self):
+        document = self.wrap_document(
+            created='2016-08-31T14:07:33+00:00',
+            classification={'title': 'unprotected', 'token': 'unprotected'},
+            file={'size': 1234, 'download': f'{self.document_url}/@@download'})
+        self.assertEqual(datetime(2016, 8, 31, 14, 7, 33, tzinfo=timezone.utc),
+                         document.created)
+        self.assertEqual('unprotected', document.classification)
+        self.assertEqual(1234, document.file_size)
+        self.assertEqual('2016-08-31T14:07:33+00:00', document.raw['created'])
+
+    def test_decoded_values_are_cached_until_the_item_is_updated(self):
+        document = self.wrap_document(created='2016-08-31T14:07:33+00:00')
+        self.assertIs(document.created, document.created)
+
+        document.update_item({'@id': self.document_url,
+                              '@type': 'opengever.document.document',
+                              'created': '2020-01-01T00:00:00+00:00'})
+        self.assertEqual(2020, document.created.year)
+
+    def test_none_is_not_decoded(self):
+        self.assertIsNone(self.wrap_document(modified=None).modified)
+
+    def test_missing_field_raises_attribute_error(self):
+        with self.assertRaises(AttributeError):
+            self.wrap_document().created
+
+    def test_dossier_fields(self):
+        dossier = self.client.wrap({
+            '@id': self.dossier_url,
+            '@type': 'opengever.dossier.businesscasedossier',
+            'start': '2016-01-01',
+            'end': None,
+            'responsible': {'title': 'Bärfuss Käthi (kathi.barfuss)',
+                            'token': 'kathi.barfuss'}})
+        self.assertIsInstance(dossier, Dossier)
+        self.assertEqual(date(2016, 1, 1), dossier.start)
+        self.assertIsNone(dossier.end)
+        self.assertEqual('kathi.barfuss', dossier.responsible)
+
+    def test_listing_columns(self):
+        self.assertEqual(list(Document.listing_columns),
+                         ModelRegistry.listing_columns('documents'))
+        self.assertEqual([], ModelRegistry.listing_columns('foo'))
@@ -1,3 +1,6 @@
+from datetime import datetime
+from datetime import timezone
+
 from .. import RepositoryFolder
 from ... import GEVERClient
 from ...tests import TestCase
@@ -9,7 +12,7 @@ class TestRepositoryFolderModel(TestCase):
         repository_folder = GEVERClient(self.repository_folder_url, self.regular_user).fetch()
         self.assertIsInstance(repository_folder, RepositoryFolder)
         self.assertEqual(13, repository_folder.items_total)
-        self.assertEqual('2016-08-31T07:07:33+00:00', repository_folder.created)
+        self.assertEqual(datetime(2016, 8, 31, 7, 7, 33, tzinfo=timezone.utc), repository_folder.created)
         self.assertEqual('Verträge mit der kantonalen Finanzverwaltung', repository_folder.items[0].title)
 
     def test_raw(self):
@@ -0,0 +1,191 @@
+from base64 import b64decode
+from base64 import b64encode
+from collections import defaultdict
+from collections import deque
+from io import BytesIO
+from pathlib import Path
+import json
+import threading
+import time
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from .exceptions import NoRecordedResponse
+
+
+REDACTED = 'REDACTED'
+
+
+class Recorder:
+    """The recorder writes the requests of the sessions it is configured for
+    (see ``GEVERSession.recorder``) with their responses to a JSONL file, one
+    JSON object per line.
+
+    Credentials are redacted: the values of the redacted_headers and of the
+    redacted_fields in JSON response bodies are replaced. Request bodies are
+    not recorded, only their size. Streamed responses (downloads) are read into
+    memory for recording them; their raw stream is replaced by the content read,
+    so that callers reading ``response.raw`` still get the whole body.
+    """
+
+    redacted_headers = frozenset(('authorization', 'proxy-authorization', 'cookie',
+                                  'set-cookie', 'x-csrf-token'))
+    redacted_fields = frozenset(('access_token', 'refresh_token', 'assertion',
+                                 'password', 'private_key'))
+
+    def __init__(self, path):
+        """
+        :param path: The path of the JSONL file, which is appended to.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = self.path.open('a', encoding='utf-8')
+        self.start = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record(self, request, response, duration):
+        """Append the request and its response to the file.
+
+        :param request: The prepared request.
+        :param response: The response, whose body is read.
+        :param duration: The seconds it took to send the request and receive
+          the response.
+        """
+        body = response.content or b''
+        # Reading the content has consumed the raw stream.
+        response.raw = BytesIO(body)
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() not in ('content-encoding', 'transfer-encoding')}
+        headers['Content-Length'] = str(len(body))
+        entry = {
+            'offset': time.monotonic() - self.start - duration,
+            'duration': duration,
+            'method': request.method,
+            'url': request.url,
+            'request_headers': self._redact_headers(request.headers),
+            'request_body_size': len(request.body) if isinstance(request.body, (bytes, str)) else None,
+            'status': response.status_code,
+            'reason': response.reason,
+            'response_headers': self._redact_headers(headers),
+        }
+        entry.update(self._encode_body(body))
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def _redact_headers(self, headers):
+        return {name: REDACTED if name.lower() in self.redacted_headers else value
+                for name, value in headers.items()}
+
+    def _encode_body(self, body):
+        # JSON bodies are decoded for redacting them, whatever their content type.
+        try:
+            return {'body': json.dumps(self._redact(json.loads(body)))}
+        except ValueError:
+            pass
+        try:
+            return {'body': body.decode('utf-8')}
+        except UnicodeDecodeError:
+            return {'body_base64': b64encode(body).decode('ascii')}
+
+    def _redact(self, data):
+        if isinstance(data, dict):
+            return {key: REDACTED if key in self.redacted_fields else self._redact(value)
+                    for key, value in data.items()}
+        if isinstance(data, list):
+            return [self._redact(value) for value in data]
+        return data
+
+
+def load_recording(path):
+    """Returns the entries of a recorded JSONL file.
+    """
+    with Path(path).open(encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class ReplayAdapter(BaseAdapter):
+    """A transport adapter serving recorded responses instead of sending the
+    requests (see ``GEVERSession.transport``).
+
+    Requests are matched by method and URL. Recorded responses of the same
+    request are served in the recorded order; the last one is served again when
+    they are exhausted. Token requests are answered with a fake token unless
+    they were recorded.
+
+    With the timing "original", each response is delayed by its recorded
+    duration; with "fast", responses are served as fast as possible.
+    """
+
+    def __init__(self, entries, timing='fast'):
+        """
+        :param entries: The recorded entries (see load_recording) or the path to
+          a recorded JSONL file.
+        :param timing: "original" or "fast".
+        """
+        super().__init__()
+        if timing not in ('original', 'fast'):
+            raise ValueError(f'Unknown timing {timing!r}, expected "original" or "fast".')
+        if isinstance(entries, (str, Path)):
+            entries = load_recording(entries)
+
+        self.timing = timing
+        self._lock = threading.Lock()
+        self.responses = defaultdict(deque)
+        for entry in entries:
+            self.responses[(entry['method'], entry['url'])].append(entry)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry = self._next_entry(request)
+        if entry is None:
+            if request.method == 'POST' and request.url.endswith('/@@oauth2-token'):
+                entry = {'status': 200, 'reason': 'OK', 'duration': 0,
+                         'response_headers': {'Content-Type': 'application/json'},
+                         'body': json.dumps({'access_token': 'replayed-token'})}
+            else:
+                raise NoRecordedResponse(request.method, request.url)
+
+        if self.timing == 'original':
+            time.sleep(entry['duration'])
+        return self._build_response(request, entry)
+
+    def close(self):
+        pass
+
+    def _next_entry(self, request):
+        with self._lock:
+            entries = self.responses.get((request.method, request.url))
+            if not entries:
+                return None
+            if len(entries) > 1:
+                return entries.popleft()
+            return entries[0]
+
+    def _build_response(self, request, entry):
+        if 'body_base64' in entry:
+            body = b64decode(entry['body_base64'])
+        else:
+            body = entry.get('body', '').encode('utf-8')
+
+        response = Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry.get('response_headers', {}))
+        response.headers['Content-Length'] = str(len(body))
+        response.raw = BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.encoding = 'utf-8'
+        return response
@@ -0,0 +1,76 @@
+import threading
+
+from . import LOG
+from .session import GEVER_SESSION_POOL
+from .session import GEVERSession
+from .session import unfrozen_time
+
+
+class TokenRefresher:
+    """The token refresher renews the bearer tokens of the pooled GEVER sessions
+    in a background thread, before they come close to expiration.
+
+    Requests then never have to wait for a token acquisition. The new token
+    replaces the ``Authorization`` header of the session in one assignment, so
+    requests in flight always see a valid header. Sessions whose refresh fails
+    are left alone; they are refreshed synchronously on their next request.
+
+    Usage::
+
+        refresher = TokenRefresher(interval=30).start()
+        ...
+        refresher.stop()
+    """
+
+    def __init__(self, interval=30, refresh_ahead_seconds=300):
+        """
+        :param interval: Seconds between two checks of the pooled sessions.
+        :param refresh_ahead_seconds: Tokens expiring within this many seconds
+          are renewed.
+        """
+        self.interval = interval
+        self.refresh_ahead_seconds = refresh_ahead_seconds
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='gever-token-refresher',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.refresh_expiring()
+
+    def refresh_expiring(self):
+        """Renew the tokens of all pooled sessions expiring soon and return the
+        number of renewed tokens.
+        """
+        deadline = unfrozen_time() + self.refresh_ahead_seconds
+        refreshed = 0
+        for key, session in list(GEVER_SESSION_POOL.sessions.items()):
+            if session.gever_token_expiration > deadline:
+                continue
+
+            with GEVER_SESSION_POOL.lock_for(key):
+                if session.gever_token_expiration > deadline:
+                    continue  # Renewed by a request in the meantime.
+                try:
+                    GEVERSession(*key)._acquire_authorization_token(session)
+                except Exception as exc:
+                    LOG.exception(exc)
+                else:
+                    refreshed += 1
+        return refreshed
@@ -0,0 +1,227 @@
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+from requests.exceptions import Timeout
+import random
+import threading
+import time
+
+from .exceptions import CircuitOpen
+
+
+class Metrics:
+    """Thread-safe counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = Counter()
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def reset(self):
+        with self._lock:
+            self.counters = Counter()
+
+    def __getitem__(self, name):
+        return self.counters[name]
+
+
+# Counters for "retries", "circuit_trips", "circuit_recoveries" and
+# "circuit_rejections" of all sessions.
+RETRY_METRICS = Metrics()
+
+
+class RetryPolicy:
+    """The retry policy decides which failed requests are retried and how long
+    to wait before the next attempt.
+
+    Only idempotent requests are retried, when the connection fails or GEVER
+    answers with one of the retry_statuses. The delay grows exponentially with
+    full jitter, capped at max_backoff; a ``Retry-After`` header of a 429 or 503
+    response is honored instead.
+    """
+
+    idempotent_methods = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+    retry_statuses = frozenset((429, 502, 503, 504))
+    retry_after_statuses = frozenset((429, 503))
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+    def is_retryable(self, request, attempt):
+        """Whether the request may be sent again after attempt failed attempts.
+        Streamed bodies cannot be sent again.
+        """
+        return (attempt < self.max_retries
+                and request.method in self.idempotent_methods
+                and isinstance(request.body, (type(None), bytes, str)))
+
+    def should_retry_response(self, request, response, attempt):
+        return (response.status_code in self.retry_statuses
+                and self.is_retryable(request, attempt))
+
+    def backoff(self, attempt, response=None):
+        """Seconds to wait before the next attempt.
+        """
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    def _retry_after(self, response):
+        if response is None or response.status_code not in self.retry_after_statuses:
+            return None
+
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class CircuitBreaker:
+    """The circuit breaker of a GEVER base URL.
+
+    After failure_threshold consecutive failures (connection errors and 5xx
+    responses) the circuit opens and requests fail fast with ``CircuitOpen``.
+    After recovery_timeout seconds one trial request is let through: when it
+    succeeds, the circuit closes again, otherwise it stays open.
+    """
+
+    def __init__(self, base_url, failure_threshold=10, recovery_timeout=30):
+        self.base_url = base_url
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def before_request(self):
+        """Raise CircuitOpen unless the request may be sent.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if not self.trial_running and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.trial_running = True
+                return
+
+        RETRY_METRICS.increment('circuit_rejections')
+        raise CircuitOpen(self.base_url)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.trial_running = False
+            if self.opened_at is not None:
+                self.opened_at = None
+                RETRY_METRICS.increment('circuit_recoveries')
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_running:
+                self.trial_running = False
+                self.opened_at = time.monotonic()
+            elif self.opened_at is None and self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                RETRY_METRICS.increment('circuit_trips')
+
+
+class CircuitBreakerRegistry:
+    """Holds one circuit breaker per GEVER base URL for the whole process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.breakers = {}
+
+    def get(self, base_url, failure_threshold, recovery_timeout):
+        with self._lock:
+            if base_url not in self.breakers:
+                self.breakers[base_url] = CircuitBreaker(
+                    base_url, failure_threshold, recovery_timeout)
+            return self.breakers[base_url]
+
+
+CIRCUIT_BREAKERS = CircuitBreakerRegistry()
+
+
+class RetryingAdapter(HTTPAdapter):
+    """A transport adapter which retries failing requests according to a retry
+    policy and guards them with a circuit breaker. Both are optional.
+
+    The number of retries of a response is stored as ``response.gever_retries``.
+    """
+
+    def __init__(self, retry_policy=None, circuit_breaker=None, **kwargs):
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        attempt = 0
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_request()
+
+            try:
+                response = super().send(request, **kwargs)
+            except (ConnectionError, Timeout):
+                self._record(failed=True)
+                if self.retry_policy is None or not self.retry_policy.is_retryable(request, attempt):
+                    raise
+                self._wait(attempt)
+                attempt += 1
+                continue
+            except Exception:
+                # Any other error must end a half-open trial as well.
+                self._record(failed=True)
+                raise
+
+            self._record(failed=response.status_code >= 500)
+            if (self.retry_policy is not None
+                    and self.retry_policy.should_retry_response(request, response, attempt)):
+                response.close()
+                self._wait(attempt, response)
+                attempt += 1
+                continue
+
+            response.gever_retries = attempt
+            return response
+
+    def _record(self, failed):
+        if self.circuit_breaker is None:
+            return
+        if failed:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    def _wait(self, attempt, response=None):
+        RETRY_METRICS.increment('retries')
+        self.retry_policy.sleep(self.retry_policy.backoff(attempt, response))
@@ -1,20 +1,109 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from requests import HTTPError
-import jwt
 import os
-import pkg_resources
 import requests
 import threading
 import time
 
+from .batch import BatchResult
 from .exceptions import APIRequestException
 from .exceptions import AuthorizationFailed
 from .exceptions import ServiceKeyMissing
+from .instrumentation import InstrumentedSession
+from .jsoncodec import get_codec
 from .keys import KeyRegistry
+from .retry import CIRCUIT_BREAKERS
+from .retry import RetryingAdapter
+from .retry import RetryPolicy
+from .tokens import get_env_token_store
 
 
-GEVER_SESSION_STORAGE = threading.local()
 GRANT_TYPE = "urn:ietf:params:oauth:grant-type:jwt-bearer"
-API_CLIENT_VERSION = pkg_resources.get_distribution('opengever.apiclient').version
+
+
+def __getattr__(name):
+    # The version is read lazily, see get_version.
+    if name == 'API_CLIENT_VERSION':
+        return get_version()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+@lru_cache(maxsize=None)
+def get_version():
+    """Returns the installed version of opengever.apiclient.
+    """
+    try:
+        from importlib.metadata import version
+    except ImportError:  # Python < 3.8
+        import pkg_resources
+        return pkg_resources.get_distribution('opengever.apiclient').version
+    return version('opengever.apiclient')
+
+
+class SessionPool:
+    """The session pool holds the ``requests`` sessions of the whole process.
+
+    There is one session per GEVER base URL and username, shared by all threads,
+    so that the bearer token and the connections are reused process-wide.
+    Creating a session and refreshing its token is serialized per key: concurrent
+    threads wait for a single token acquisition instead of each making their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Remove all sessions from the pool.
+        """
+        with self._lock:
+            self.sessions = {}
+            self.locks = {}
+            self.invalidated = {}
+
+    def invalidate(self, base_urls):
+        """Remove the sessions of the GEVER base URLs from the pool, e.g. because
+        their keys have changed. Sessions still in use acquire a new token on
+        their next request. Tokens of a token store issued before are not used
+        anymore (see invalidated_at).
+        """
+        with self._lock:
+            now = unfrozen_time()
+            for base_url in base_urls:
+                self.invalidated[base_url] = now
+            for key in [key for key in self.sessions if key[0] in base_urls]:
+                self.sessions.pop(key).gever_token_expiration = 0
+
+    def invalidated_at(self, base_url):
+        """Returns the time the sessions of the GEVER base URL were last
+        invalidated, or 0.
+        """
+        return self.invalidated.get(base_url, 0)
+
+    def lock_for(self, key):
+        """Returns the lock serializing token acquisition for the session key.
+        """
+        with self._lock:
+            return self.locks.setdefault(key, threading.RLock())
+
+    def get(self, key, factory):
+        """Returns the session for the key, creating it with factory when missing.
+        """
+        session = self.sessions.get(key)
+        if session is not None:
+            return session
+
+        with self.lock_for(key):
+            session = self.sessions.get(key)
+            if session is None:
+                session = self.sessions[key] = factory()
+        return session
+
+
+GEVER_SESSION_POOL = SessionPool()
+KeyRegistry.subscribe(GEVER_SESSION_POOL.invalidate)
 
 
 class GEVERSession:
@@ -22,7 +111,8 @@ class GEVERSession:
     GEVER client.
 
     The requests session is reused for multiple requests so that we have a smaller
-    footprint regarding oauth authentication requests. The session is cached in memory.
+    footprint regarding oauth authentication requests. The session is cached in memory
+    and shared between all threads of the process (see ``SessionPool``).
 
     The GeverSession is instantiated with a GEVER url (to any ressource)
     and the operating user. Whenever a request to GEVER is initiated, the session
@@ -32,6 +122,44 @@ class GEVERSession:
     min_seconds_to_expiration = 60
     session_expiration_seconds = 60 * 60
 
+    # Connection pooling of the requests sessions: number of hosts to keep
+    # connection pools for, and maximum number of idle connections per host.
+    pool_connections = 10
+    pool_maxsize = 10
+
+    # Idempotent requests failing with connection errors or 429, 502, 503, 504
+    # are retried according to the retry policy (None disables retries).
+    retry_policy = RetryPolicy()
+
+    # The circuit breaker of a GEVER base URL opens after this many consecutive
+    # failures and lets a trial request through after the timeout in seconds.
+    # A threshold of None disables the circuit breaker.
+    circuit_breaker_threshold = 10
+    circuit_breaker_timeout = 30
+
+    # A TokenStore for sharing bearer tokens, e.g. between processes. When None,
+    # the SQLite file configured in OPENGEVER_APICLIENT_TOKEN_CACHE is used, if any.
+    token_store = None
+
+    # The name of the JSON codec decoding the responses (see jsoncodec). When None,
+    # the codec configured in OPENGEVER_APICLIENT_JSON_CODEC or else the fastest
+    # installed codec is used.
+    json_codec = None
+
+    # An Instrument (e.g. a HistogramCollector) receiving a RequestEvent for
+    # every request. Disabled when None.
+    instrument = None
+
+    # A recording.Recorder writing all requests and responses to a JSONL file.
+    # Disabled when None.
+    recorder = None
+
+    # A transport adapter used instead of the network for all requests, including
+    # token requests, e.g. a recording.ReplayAdapter. Retries and the circuit
+    # breaker are disabled with a transport. It applies to sessions created
+    # afterwards, see clear().
+    transport = None
+
     def __init__(self, url, username, headers={}):
         self.gever_base_url = KeyRegistry.get_base_url_for(url)
         if not self.gever_base_url:
@@ -50,35 +178,93 @@ class GEVERSession:
         This method is meant to be called right before making a request, for each
         request.
         """
-        token_expiration = self._session.gever_token_expiration
-        if unfrozen_time() > (token_expiration - self.min_seconds_to_expiration):
-            self._acquire_authorization_token(self._session)
+        if self._token_expires_soon():
+            with GEVER_SESSION_POOL.lock_for(self._session_key):
+                # Another thread may have refreshed the token while we were waiting.
+                if self._token_expires_soon():
+                    self._acquire_authorization_token(self._session)
+        self._session.bind(self.instrument, self.recorder)
         return self._session
 
     @staticmethod
     def clear():
         """Clear all caches.
         """
-        GEVER_SESSION_STORAGE.sessions = None
+        GEVER_SESSION_POOL.clear()
+        CIRCUIT_BREAKERS.clear()
+
+    @classmethod
+    def prewarm(cls, url, usernames, workers=8):
+        """Create the pooled sessions of many users concurrently, acquiring their
+        tokens, so that the first request of each user does not have to wait for it.
+
+        :param url: A URL of the GEVER.
+        :param usernames: The users to create sessions for.
+        :param workers: The number of tokens acquired concurrently.
+        :returns: A BatchResult with the sessions in the order of the (deduplicated)
+          usernames and the exceptions of failed users, keyed by username.
+        """
+        if not KeyRegistry.get_base_url_for(url):
+            raise ServiceKeyMissing(url)
+
+        result = BatchResult()
+        usernames = list(OrderedDict.fromkeys(usernames))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [(username, executor.submit(cls, url, username)) for username in usernames]
+            for username, future in futures:
+                try:
+                    result.add_result(future.result())
+                except Exception as exception:
+                    result.add_error(username, exception)
+        return result.finish()
+
+    def is_responsible_for(self, url, username):
+        """Whether this session can be used for requests to url in the name of
+        username, i.e. whether url has the same GEVER base URL. The lookup is
+        memoized by the KeyRegistry.
+        """
+        return (username == self.username
+                and KeyRegistry.get_base_url_for(url) == self.gever_base_url)
+
+    def decode(self, response):
+        """Decode the JSON body of a response with the JSON codec.
+        """
+        return get_codec(self.json_codec).loads(response.content)
+
+    @property
+    def _session_key(self):
+        return (self.gever_base_url, self.username)
+
+    def _token_expires_soon(self):
+        token_expiration = self._session.gever_token_expiration
+        return unfrozen_time() > (token_expiration - self.min_seconds_to_expiration)
 
     def _get_session(self):
         """Returns a ``requests`` session for the GEVER client with the given url.
         The session may be outdated.
-        The session is reused over multiple requests by the same person.
+        The session is reused over multiple requests by the same person, in all threads.
         """
-        if getattr(GEVER_SESSION_STORAGE, "sessions", None) is None:
-            GEVER_SESSION_STORAGE.sessions = {}
-
-        unique_session_key = (self.gever_base_url, self.username)
-        if unique_session_key not in GEVER_SESSION_STORAGE.sessions:
-            GEVER_SESSION_STORAGE.sessions[unique_session_key] = self._make_session()
-
-        return GEVER_SESSION_STORAGE.sessions[unique_session_key]
+        return GEVER_SESSION_POOL.get(self._session_key, self._make_session)
 
     def _make_session(self):
         """Create a fresh requests session and return it.
         """
-        session = requests.Session()
+        session = InstrumentedSession()
+        session.gever_base_url = self.gever_base_url
+        circuit_breaker = None
+        if self.circuit_breaker_threshold is not None:
+            circuit_breaker = CIRCUIT_BREAKERS.get(
+                self.gever_base_url,
+                self.circuit_breaker_threshold,
+                self.circuit_breaker_timeout)
+
+        adapter = self.transport or RetryingAdapter(
+            retry_policy=self.retry_policy,
+            circuit_breaker=circuit_breaker,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
         session.hooks["response"].append(self._raise_for_status_hook)
         session.headers.update(
             {
@@ -98,40 +284,85 @@ class GEVERSession:
 
     @property
     def _user_agent(self):
-        """
-        Use the version defined in setup.py. The commit hash could be included,
-        but this is good enough for now.
-        """
-        custom_user_agent = os.environ.get('OPENGEVER_APICLIENT_USER_AGENT', '')
-        return f'opengever.apiclient/{API_CLIENT_VERSION} {custom_user_agent}'.strip()
+        return get_user_agent()
 
     def _acquire_authorization_token(self, session):
         """Acquires a fresh authorization token from GEVER and sets it in the
         current session.
         """
+        token_store = self.token_store or get_env_token_store()
+        if token_store is not None:
+            stored = token_store.get(self.gever_base_url, self.username)
+            # Only use stored tokens which are newer than the one of the session,
+            # were issued after the sessions were last invalidated (e.g. with an
+            # old key) and are not about to expire.
+            if (stored is not None
+                    and stored[1] > getattr(session, "gever_token_expiration", 0)
+                    and (stored[1] - self.session_expiration_seconds
+                         >= GEVER_SESSION_POOL.invalidated_at(self.gever_base_url))
+                    and unfrozen_time() < stored[1] - self.min_seconds_to_expiration):
+                self._set_authorization_token(session, *stored)
+                return
+
         service_key = KeyRegistry.get_key_for(self.gever_base_url)
         if service_key is None:
             raise ServiceKeyMissing(self.gever_base_url)
 
-        claim_set = {
-            "iss": service_key["client_id"],
-            "sub": self.username,
-            "aud": service_key["token_uri"],
-            "iat": int(unfrozen_time()),
-            "exp": int(unfrozen_time() + self.session_expiration_seconds),
-        }
-
-        grant = jwt.encode(claim_set, service_key["private_key"], algorithm="RS256")
-        payload = {"grant_type": GRANT_TYPE, "assertion": grant}
+        payload, expiration = make_grant(
+            service_key, self.username, self.session_expiration_seconds,
+            KeyRegistry.get_signing_key_for(self.gever_base_url))
         try:
-            response = requests.post(service_key["token_uri"], data=payload)
+            response = self._post_token_request(service_key["token_uri"], payload)
             response.raise_for_status()
         except HTTPError as exception:
             raise AuthorizationFailed(exception)
 
         bearer_token = response.json()["access_token"]
+        self._set_authorization_token(session, bearer_token, expiration)
+        if token_store is not None:
+            token_store.set(self.gever_base_url, self.username, bearer_token, expiration)
+
+    def _post_token_request(self, token_uri, payload):
+        if self.transport is None:
+            return requests.post(token_uri, data=payload)
+
+        with requests.Session() as session:
+            session.mount("http://", self.transport)
+            session.mount("https://", self.transport)
+            return session.post(token_uri, data=payload)
+
+    def _set_authorization_token(self, session, bearer_token, expiration):
         session.headers.update({"Authorization": f"Bearer {bearer_token}"})
-        session.gever_token_expiration = claim_set["exp"]
+        session.gever_token_expiration = expiration
+        session.token_refreshed = True
+
+
+def get_user_agent():
+    """
+    Use the version defined in setup.py. The commit hash could be included,
+    but this is good enough for now.
+    """
+    custom_user_agent = os.environ.get('OPENGEVER_APICLIENT_USER_AGENT', '')
+    return f'opengever.apiclient/{get_version()} {custom_user_agent}'.strip()
+
+
+def make_grant(service_key, username, expiration_seconds, signing_key=None):
+    """Returns the payload for requesting a bearer token for username from the
+    GEVER token endpoint, and the expiration timestamp of the token.
+    The grant is signed with the signing_key object when given, which is much
+    faster than parsing the PEM private key of the service key.
+    """
+    claim_set = {
+        "iss": service_key["client_id"],
+        "sub": username,
+        "aud": service_key["token_uri"],
+        "iat": int(unfrozen_time()),
+        "exp": int(unfrozen_time() + expiration_seconds),
+    }
+
+    import jwt  # Imported on first use, because it is expensive to import.
+    grant = jwt.encode(claim_set, signing_key or service_key["private_key"], algorithm="RS256")
+    return {"grant_type": GRANT_TYPE, "assertion": grant}, claim_set["exp"]
 
 
 def unfrozen_time(*args, **kwargs):
@@ -140,9 +371,16 @@ def unfrozen_time(*args, **kwargs):
     The unfrozen_time function makes sure to always return a real time, no matter
     whether the time is frozen or the freezegun is even installed.
     """
+    return _get_real_time()(*args, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def _get_real_time():
+    """Returns the real time function, looking up freezegun only once.
+    """
     try:
         from freezegun.api import real_time
     except ImportError:
-        return time.time(*args, **kwargs)
+        return time.time
     else:
-        return real_time(*args, **kwargs)
+        return real_time
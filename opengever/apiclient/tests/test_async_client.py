@@ -0,0 +1,125 @@
+from io import BytesIO
+from unittest import mock
+import asyncio
+
+from ..async_client import AsyncGEVERClient
+from ..async_session import AsyncGEVERSession
+from ..exceptions import APIRequestException
+from ..exceptions import AuthorizationFailed
+from ..exceptions import ServiceKeyMissing
+from ..models import Document
+from ..models.base import APIModel
+from . import TestCase
+
+
+class TestAsyncClient(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        AsyncGEVERSession.clear()
+
+    def run_async(self, coroutine):
+        async def run_and_close():
+            try:
+                return await coroutine
+            finally:
+                await AsyncGEVERSession.aclose()
+
+        return asyncio.run(run_and_close())
+
+    def test_error_when_no_key_configured(self):
+        with self.assertRaises(ServiceKeyMissing):
+            AsyncGEVERClient('http://gever.example.com/fd/', self.regular_user)
+
+    def test_adopt_changes_url(self):
+        document_client = AsyncGEVERClient(self.document_url, self.regular_user)
+        dossier_client = document_client.adopt(self.dossier_url)
+        self.assertIsInstance(dossier_client, AsyncGEVERClient)
+        self.assertEqual(self.dossier_url, dossier_client.url)
+        self.assertEqual(self.regular_user, dossier_client.username)
+
+    def test_fetch_document(self):
+        client = AsyncGEVERClient(self.document_url, self.regular_user)
+        document = self.run_async(client.fetch())
+        self.assertIsInstance(document, Document)
+        self.assertIsInstance(document.client, AsyncGEVERClient)
+        self.assertEqual('Verträgsentwurf', document.title)
+
+    def test_fetch_raw_document(self):
+        client = AsyncGEVERClient(self.document_url, self.regular_user)
+        document = self.run_async(client.fetch(raw=True))
+        self.assertIsInstance(document, dict)
+        self.assertEqual('Verträgsentwurf', document['title'])
+
+    def test_failure_when_retrieving_unknown_url(self):
+        client = AsyncGEVERClient(f'{self.plone_url}ordnungssystem/bad-url', self.regular_user)
+        with self.assertRaises(APIRequestException):
+            self.run_async(client.fetch())
+
+    def test_concurrent_requests_share_one_session(self):
+        client = AsyncGEVERClient(self.dossier_url, self.regular_user)
+
+        async def fetch_concurrently():
+            clients = [client.adopt(self.document_url) for _ in range(10)]
+            documents = await asyncio.gather(*(each.fetch() for each in clients))
+            sessions = {id(await each.session()) for each in clients}
+            return documents, sessions
+
+        documents, sessions = self.run_async(fetch_concurrently())
+        self.assertEqual(10, len(documents))
+        self.assertEqual({self.document_url}, {document.url for document in documents})
+        self.assertEqual(1, len(sessions))
+
+    def test_afetch_updates_partial_model(self):
+        client = AsyncGEVERClient(self.dossier_url, self.regular_user)
+        document = client.wrap({'@id': self.document_url,
+                                '@type': 'opengever.document.document'})
+        self.assertIs(document, self.run_async(document.afetch()))
+        self.assertEqual('Verträgsentwurf', document.title)
+
+    def test_sync_methods_of_async_models_raise_type_error(self):
+        client = AsyncGEVERClient(self.dossier_url, self.regular_user)
+        document = client.wrap({'@id': self.document_url,
+                                '@type': 'opengever.document.document'})
+        with self.assertRaisesRegex(TypeError, 'use afetch instead'):
+            document.fetch()
+        with self.assertRaisesRegex(TypeError, 'use ahas_addable_type instead'):
+            document.has_addable_type('opengever.document.document')
+        with self.assertRaises(TypeError):
+            document.download(BytesIO())
+
+    def test_session_is_closed_when_token_acquisition_fails(self):
+        client = AsyncGEVERClient(self.dossier_url, self.regular_user)
+        with mock.patch.object(AsyncGEVERSession, '_acquire_authorization_token',
+                               side_effect=AuthorizationFailed(Exception('denied'))), \
+                mock.patch('httpx.AsyncClient.aclose', autospec=True) as aclose:
+            with self.assertRaises(AuthorizationFailed):
+                self.run_async(client.session())
+        aclose.assert_called_once()
+
+    def test_listing(self):
+        client = AsyncGEVERClient(self.dossier_url, self.regular_user)
+        listing = self.run_async(client.listing(name='documents', columns=['title']))
+        self.assertEqual(listing['items_total'], 12)
+        self.assertIsInstance(listing['items'][0], Document)
+        self.assertEqual('Feedback zum Vertragsentwurf', listing['items'][0].title)
+
+    def test_create_document(self):
+        client = AsyncGEVERClient(self.dossier_url, self.regular_user)
+        document = self.run_async(client.create_document(
+            title='Ein Dokument',
+            file=BytesIO(b'content of the document'),
+            content_type='text/plain',
+            filename='Ein Dokument.txt',
+            size=23,
+        ))
+
+        self.assertIsInstance(document, APIModel)
+        self.assertEqual('Ein Dokument', document.title)
+        self.assertEqual(23, document.file['size'])
+
+    def test_accepts_headers(self):
+        client = AsyncGEVERClient(self.dossier_url, self.regular_user,
+                                  headers={'Accept-Language': 'fr-CH'})
+        session = self.run_async(client.session())
+        self.assertEqual('fr-CH', session.headers['Accept-Language'])
@@ -0,0 +1,32 @@
+from ..batch import BatchResult
+from . import TestCase
+
+
+class TestBatchResult(TestCase):
+
+    def test_results_and_errors(self):
+        error = ValueError('broken')
+        result = BatchResult()
+        result.add_result('first')
+        result.add_error(1, error)
+        result.add_result('third')
+        result.finish()
+
+        self.assertFalse(result.ok)
+        self.assertEqual(['first', None, 'third'], result.results)
+        self.assertEqual({1: error}, result.errors)
+
+    def test_metrics(self):
+        result = BatchResult()
+        result.add_result('first')
+        result.add_error(1, ValueError('broken'))
+        result.finish()
+
+        metrics = result.metrics
+        self.assertDictContainsSubset({'items': 2, 'succeeded': 1, 'failed': 1}, metrics)
+        self.assertGreater(metrics['duration'], 0)
+        self.assertEqual(2 / metrics['duration'], metrics['items_per_second'])
+
+    def test_duration_is_frozen_when_finished(self):
+        result = BatchResult().finish()
+        self.assertEqual(result.duration, result.duration)
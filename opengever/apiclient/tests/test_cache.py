@@ -0,0 +1,123 @@
+import requests_mock
+
+from .. import GEVERClient
+from ..cache import ResponseCache
+from ..session import GEVERSession
+from . import TestCase
+
+
+class TestResponseCache(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mocker = requests_mock.Mocker()
+        self.mocker.start()
+        self.addCleanup(self.mocker.stop)
+        self.mocker.post(f'{self.plone_url}@@oauth2-token', json={'access_token': 'token'})
+        self.session = GEVERSession(self.document_url, self.regular_user)
+
+    def test_serves_cached_response_within_ttl(self):
+        resource = self.mocker.get(self.document_url, json={'title': 'Dokument'})
+        cache = ResponseCache(ttl=60)
+        self.assertEqual({'title': 'Dokument'}, cache.get_json(self.session, self.document_url))
+        self.assertEqual({'title': 'Dokument'}, cache.get_json(self.session, self.document_url))
+        self.assertEqual(1, resource.call_count)
+        self.assertDictContainsSubset({'hits': 1, 'misses': 1, 'revalidations': 0}, cache.stats)
+
+    def test_params_are_part_of_the_key(self):
+        resource = self.mocker.get(self.document_url, json={'title': 'Dokument'})
+        cache = ResponseCache(ttl=60)
+        cache.get_json(self.session, self.document_url, {'metadata_fields': ['UID']})
+        cache.get_json(self.session, self.document_url)
+        self.assertEqual(2, resource.call_count)
+
+    def test_users_do_not_share_entries(self):
+        resource = self.mocker.get(self.document_url, json={'title': 'Dokument'})
+        cache = ResponseCache(ttl=60)
+        cache.get_json(self.session, self.document_url)
+        cache.get_json(GEVERSession(self.document_url, 'nicole.kohler'), self.document_url)
+        self.assertEqual(2, resource.call_count)
+
+    def test_revalidates_expired_entries_with_etag(self):
+        resource = self.mocker.get(self.document_url, [
+            {'json': {'title': 'Dokument'}, 'headers': {'ETag': '"v1"'}},
+            {'status_code': 304},
+        ])
+        cache = ResponseCache(ttl=0)
+        cache.get_json(self.session, self.document_url)
+        self.assertEqual({'title': 'Dokument'}, cache.get_json(self.session, self.document_url))
+
+        self.assertEqual('"v1"', resource.last_request.headers['If-None-Match'])
+        self.assertDictContainsSubset({'hits': 0, 'misses': 1, 'revalidations': 1}, cache.stats)
+
+    def test_revalidates_expired_entries_with_last_modified(self):
+        modified = 'Wed, 31 Aug 2016 14:07:33 GMT'
+        resource = self.mocker.get(self.document_url, [
+            {'json': {'title': 'Dokument'}, 'headers': {'Last-Modified': modified}},
+            {'json': {'title': 'Neu'}, 'headers': {'Last-Modified': modified}},
+        ])
+        cache = ResponseCache(ttl=0)
+        cache.get_json(self.session, self.document_url)
+        self.assertEqual({'title': 'Neu'}, cache.get_json(self.session, self.document_url))
+        self.assertEqual(modified, resource.last_request.headers['If-Modified-Since'])
+        self.assertDictContainsSubset({'misses': 2, 'revalidations': 0}, cache.stats)
+
+    def test_evicts_least_recently_used_entries(self):
+        self.mocker.get(requests_mock.ANY, json={})
+        cache = ResponseCache(ttl=60, max_entries=2)
+        cache.get_json(self.session, f'{self.dossier_url}/a')
+        cache.get_json(self.session, f'{self.dossier_url}/b')
+        cache.get_json(self.session, f'{self.dossier_url}/a')
+        cache.get_json(self.session, f'{self.dossier_url}/c')
+
+        self.assertEqual([f'{self.dossier_url}/a', f'{self.dossier_url}/c'],
+                         [key[2] for key in cache.entries])
+
+    def test_invalidate(self):
+        self.mocker.get(requests_mock.ANY, json={})
+        cache = ResponseCache(ttl=60)
+        cache.get_json(self.session, self.dossier_url)
+        cache.get_json(self.session, f'{self.dossier_url}/@sharing')
+        cache.get_json(self.session, self.repository_folder_url)
+        cache.get_json(self.session, f'{self.dossier_url}0')
+        cache.invalidate(self.dossier_url)
+        self.assertEqual([self.repository_folder_url, f'{self.dossier_url}0'],
+                         [key[2] for key in cache.entries])
+
+
+class TestClientWithResponseCache(TestCase):
+
+    def test_fetch_is_cached(self):
+        client = GEVERClient(self.document_url, self.regular_user, cache=ResponseCache())
+        with requests_mock.Mocker(real_http=True) as mocker:
+            first = client.fetch()
+            second = client.fetch()
+        self.assertEqual(first, second)
+        self.assertEqual(1, mocker.call_count)
+        self.assertDictContainsSubset({'hits': 1, 'misses': 1}, client.cache.stats)
+
+    def test_adopted_clients_share_the_cache(self):
+        client = GEVERClient(self.document_url, self.regular_user, cache=ResponseCache())
+        self.assertIs(client.cache, client.adopt(self.dossier_url).cache)
+        self.assertIs(client.cache, client.fetch().client.cache)
+
+    def test_update_invalidates_cached_object(self):
+        client = GEVERClient(self.dossier_url, self.regular_user, cache=ResponseCache())
+        client.fetch()
+        client.update_object(title='Ein anderer Titel')
+        self.assertEqual('Ein anderer Titel', client.fetch().title)
+
+    def test_create_invalidates_cached_container(self):
+        client = GEVERClient(self.repository_folder_url, self.regular_user, cache=ResponseCache())
+        with requests_mock.Mocker() as mocker:
+            mocker.post(f'{self.plone_url}@@oauth2-token', json={'access_token': 'token'})
+            container = mocker.get(self.repository_folder_url, json={
+                '@id': self.repository_folder_url,
+                '@type': 'opengever.repository.repositoryfolder',
+                'items': []})
+            mocker.post(self.repository_folder_url, json={
+                '@id': self.dossier_url, '@type': 'opengever.dossier.businesscasedossier'})
+            client.fetch()
+            client.create_dossier('Neues Dossier', raw=True)
+            client.fetch()
+        self.assertEqual(2, container.call_count)
@@ -1,4 +1,9 @@
+from datetime import datetime
+from datetime import timezone
 from io import BytesIO
+from urllib.parse import urlparse
+import re
+import threading
 
 import requests_mock
 
@@ -20,6 +25,16 @@ class TestClient(TestCase):
         self.assertEqual(self.dossier_url, dossier_client.url)
         self.assertEqual(self.regular_user, dossier_client.username)
 
+    def test_adopt_shares_session(self):
+        document_client = GEVERClient(self.document_url, self.regular_user)
+        dossier_client = document_client.adopt(self.dossier_url)
+        self.assertIs(document_client.session, dossier_client.session)
+
+    def test_adopt_lazy_models(self):
+        client = GEVERClient(self.document_url, self.regular_user, lazy_models=True)
+        self.assertTrue(client.adopt(self.dossier_url).lazy_models)
+        self.assertFalse(GEVERClient(self.document_url, self.regular_user).lazy_models)
+
     def test_fetch_document(self):
         client = GEVERClient(self.document_url, self.regular_user)
         document = client.fetch()
@@ -52,6 +67,50 @@ class TestClient(TestCase):
         error = cm.output[-1]
         self.assertIn('Response from GEVER: GEVER says no', error)
 
+    def test_fetch_many(self):
+        client = GEVERClient(self.root_url, self.regular_user)
+        result = client.fetch_many([self.document_url, self.dossier_url, self.document_url],
+                                   workers=2)
+        self.assertTrue(result.ok)
+        self.assertEqual([self.document_url, self.dossier_url],
+                         [item.url for item in result.results])
+        self.assertIsInstance(result.results[0], Document)
+
+    def test_fetch_many_collects_errors(self):
+        bad_url = f'{self.plone_url}ordnungssystem/bad-url'
+        client = GEVERClient(self.root_url, self.regular_user)
+        with self.assertLogs(level='ERROR'):
+            result = client.fetch_many([bad_url, self.document_url], raw=True)
+
+        self.assertEqual([None, self.document_url],
+                         [item and item['@id'] for item in result.results])
+        self.assertEqual([bad_url], list(result.errors))
+        self.assertIsInstance(result.errors[bad_url], APIRequestException)
+
+    def test_fetch_many_with_search(self):
+        client = GEVERClient(self.root_url, self.regular_user)
+        with requests_mock.Mocker() as mocker:
+            mocker.get(f'{self.plone_url}@search', json={'items': [
+                {'@id': self.dossier_url, '@type': 'opengever.dossier.businesscasedossier'},
+                {'@id': self.document_url, '@type': 'opengever.document.document'},
+            ]})
+            mocker.get(self.repository_folder_url, json={
+                '@id': self.repository_folder_url,
+                '@type': 'opengever.repository.repositoryfolder'})
+
+            result = client.fetch_many(
+                [self.document_url, self.repository_folder_url, self.dossier_url],
+                use_search=True, raw=True)
+
+        self.assertEqual([self.document_url, self.repository_folder_url, self.dossier_url],
+                         [item['@id'] for item in result.results])
+        self.assertEqual(2, mocker.call_count)
+        self.assertEqual(
+            [urlparse(url).path for url in (self.document_url,
+                                            self.repository_folder_url,
+                                            self.dossier_url)],
+            mocker.request_history[0].qs['path.query:list'])
+
     def test_create_dossier(self):
         client = GEVERClient(self.repository_folder_url, self.regular_user)
         dossier = client.create_dossier('Wichtige Unterlagen',
@@ -59,7 +118,7 @@ class TestClient(TestCase):
         self.assertIsInstance(dossier, APIModel)
         self.assertEqual('Wichtige Unterlagen', dossier.title)
         self.assertEqual('Richtig Wichtig', dossier.description)
-        self.assertEqual(self.regular_user, dossier.responsible['token'])
+        self.assertEqual(self.regular_user, dossier.responsible)
 
     def test_create_dossier_raw(self):
         client = GEVERClient(self.repository_folder_url, self.regular_user)
@@ -161,18 +220,156 @@ class TestClient(TestCase):
         )
         first_document = listing['items'][0]
         self.assertEqual(first_document.title, 'Feedback zum Vertragsentwurf')
-        self.assertEqual(first_document.created, '2016-08-31T16:05:33+00:00')
-        self.assertEqual(first_document.modified, '2016-08-31T16:05:33+00:00')
+        self.assertEqual(first_document.created, datetime(2016, 8, 31, 16, 5, 33, tzinfo=timezone.utc))
+        self.assertEqual(first_document.modified, datetime(2016, 8, 31, 16, 5, 33, tzinfo=timezone.utc))
         self.assertEqual(first_document.filename, 'Feedback zum Vertragsentwurf.docx')
         self.assertEqual(first_document.checked_out, '')
         self.assertEqual(first_document.bumblebee_checksum, '5ed3f5959a83418cb26e0ae4f54319695f0c5faac0833616bdba8d4d856f659c')
         self.assertEqual(first_document.file_extension, '.docx')
         self.assertEqual(first_document.document_type, None)
 
+    def test_listing_requests_default_columns_of_the_model(self):
+        client = GEVERClient(url=self.dossier_url, username=self.regular_user)
+        with requests_mock.Mocker() as mocker:
+            mocker.get(f'{self.dossier_url}/@listing', json={'items': [], 'items_total': 0})
+            client.listing(name='documents')
+            client.listing(name='documents', columns=[])
+
+        self.assertEqual(['@type'] + list(Document.listing_columns),
+                         mocker.request_history[0].qs['columns:list'])
+        self.assertEqual(['@type'], mocker.request_history[1].qs['columns:list'])
+
     def test_listing_passes_optional_params(self):
         listing = GEVERClient(url=self.dossier_url, username=self.regular_user).listing(name='documents', b_size=700)
         self.assertEqual(700, listing['b_size'])
 
+    def test_iter_listing(self):
+        client = GEVERClient(url=self.dossier_url, username=self.regular_user)
+        listing = client.listing(name='documents', b_size=100)
+        items = list(client.iter_listing(name='documents', batch_size=5))
+        self.assertEqual(12, len(items))
+        self.assertIsInstance(items[0], Document)
+        self.assertEqual([item.url for item in listing['items']],
+                         [item.url for item in items])
+
+    def test_iter_listing_raw(self):
+        client = GEVERClient(url=self.dossier_url, username=self.regular_user)
+        items = list(client.iter_listing(name='documents', columns=['title'],
+                                         batch_size=5, raw=True))
+        self.assertEqual(12, len(items))
+        self.assertIsInstance(items[0], dict)
+        self.assertEqual('Feedback zum Vertragsentwurf', items[0]['title'])
+
+    def test_iter_listing_is_lazy(self):
+        client = GEVERClient(url=self.dossier_url, username=self.regular_user)
+        with requests_mock.Mocker(real_http=True) as mocker:
+            items = client.iter_listing(name='documents', batch_size=5)
+            next(items)
+            items.close()
+        # The first batch and the prefetched second batch.
+        self.assertEqual(2, mocker.call_count)
+
+    def test_iter_listing_incremental(self):
+        client = GEVERClient(url=self.dossier_url, username=self.regular_user)
+        items = list(client.iter_listing(name='documents', batch_size=5))
+        incremental = list(client.iter_listing(name='documents', batch_size=5,
+                                               incremental=True))
+        self.assertIsInstance(incremental[0], Document)
+        self.assertEqual([item.url for item in items],
+                         [item.url for item in incremental])
+        self.assertEqual([item.raw for item in items],
+                         [item.raw for item in incremental])
+
+    def test_iter_listing_incremental_decodes_item_by_item(self):
+        client = GEVERClient(url=self.dossier_url, username=self.regular_user)
+        with requests_mock.Mocker() as mocker:
+            mocker.get(f'{self.dossier_url}/@listing', json={
+                'items': [{'@id': f'{self.dossier_url}/document-{index}',
+                           '@type': 'opengever.document.document',
+                           'title': f'Dokument {index}',
+                           'keywords': [{'title': 'A', 'token': 'a'}]}
+                          for index in range(3)],
+                'items_total': 3})
+            items = list(client.iter_listing(name='documents', raw=True,
+                                             incremental=True))
+
+        self.assertEqual(1, mocker.call_count)
+        self.assertEqual(['Dokument 0', 'Dokument 1', 'Dokument 2'],
+                         [item['title'] for item in items])
+        self.assertEqual([{'title': 'A', 'token': 'a'}], items[0]['keywords'])
+
+    def mock_tree(self, mocker):
+        """Register @search responses for a small tree, in which dossier-1 is
+        found below both repository folders.
+        """
+        root = self.repository_url
+        folder = 'opengever.repository.repositoryfolder'
+        dossier = 'opengever.dossier.businesscasedossier'
+        document = 'opengever.document.document'
+        tree = {
+            root: [(f'{root}/a', folder), (f'{root}/b', folder)],
+            f'{root}/a': [(f'{root}/dossier-1', dossier), (f'{root}/a/document-1', document)],
+            f'{root}/b': [(f'{root}/dossier-1', dossier), (f'{root}/b/dossier-2', dossier)],
+            f'{root}/dossier-1': [(f'{root}/dossier-1/document-{index}', document)
+                                  for index in range(2, 7)],
+            f'{root}/b/dossier-2': [],
+        }
+
+        def search(request, context):
+            children = tree[request.url.split('/@search')[0]]
+            b_start = int(request.qs['b_start:int'][0])
+            b_size = int(request.qs['b_size:int'][0])
+            return {'items_total': len(children),
+                    'items': [{'@id': url, '@type': portal_type,
+                               'is_folderish': portal_type != document}
+                              for url, portal_type in children[b_start:b_start + b_size]]}
+
+        mocker.get(re.compile(r'/@search'), json=search)
+
+    def test_walk(self):
+        client = GEVERClient(self.repository_url, self.regular_user, lazy_models=True)
+        with requests_mock.Mocker() as mocker:
+            self.mock_tree(mocker)
+            items = list(client.walk(workers=1, batch_size=2))
+
+        self.assertEqual(
+            ['a', 'b', 'dossier-1', 'a/document-1', 'b/dossier-2',
+             'dossier-1/document-2', 'dossier-1/document-3', 'dossier-1/document-4',
+             'dossier-1/document-5', 'dossier-1/document-6'],
+            [item.url[len(self.repository_url) + 1:] for item in items])
+        self.assertIsInstance(items[3], Document)
+        # dossier-1 is searched once, in three batches.
+        searched = [request.url.split('/@search')[0] for request in mocker.request_history]
+        self.assertEqual(3, searched.count(f'{self.repository_url}/dossier-1'))
+
+    def test_walk_concurrently_with_types_and_max_depth(self):
+        client = GEVERClient(self.repository_url, self.regular_user, lazy_models=True)
+        with requests_mock.Mocker() as mocker:
+            self.mock_tree(mocker)
+            dossiers = list(client.walk(types=['opengever.dossier.businesscasedossier'],
+                                        workers=4, raw=True))
+            shallow = list(client.walk(max_depth=2, raw=True))
+
+        self.assertEqual({f'{self.repository_url}/dossier-1', f'{self.repository_url}/b/dossier-2'},
+                         {item['@id'] for item in dossiers})
+        self.assertEqual(5, len(shallow))
+
+    def test_walk_can_be_cancelled(self):
+        client = GEVERClient(self.repository_url, self.regular_user, lazy_models=True)
+        cancel = threading.Event()
+        with requests_mock.Mocker() as mocker:
+            self.mock_tree(mocker)
+            items = client.walk(workers=1, raw=True, cancel=cancel)
+            next(items)
+            cancel.set()
+            self.assertEqual([], list(items))
+
+            items = client.walk(workers=1, raw=True)
+            next(items)
+            items.close()
+
+        self.assertEqual(2, mocker.call_count)
+
     def test_office_connector_url(self):
         response = GEVERClient(url=self.document_url, username=self.regular_user).get_office_connector_url()
 
@@ -201,6 +398,61 @@ class TestClient(TestCase):
             'size': 23
         }, document.file)
 
+    def test_create_document_in_chunks(self):
+        progress = []
+        document = GEVERClient(url=self.dossier_url, username=self.regular_user).create_document(
+            title='Ein Dokument',
+            file=BytesIO(b'content of the document'),
+            content_type='text/plain',
+            filename='Ein Dokument.txt',
+            size=23,
+            chunk_size=10,
+            progress=lambda uploaded, size: progress.append((uploaded, size)),
+        )
+
+        self.assertEqual([(10, 23), (20, 23), (23, 23)], progress)
+        self.assertEqual(23, document.file['size'])
+
+    def test_bulk_create_documents(self):
+        client = GEVERClient(url=self.dossier_url, username=self.regular_user)
+        result = client.bulk_create_documents((
+            {
+                'title': f'Dokument {number}',
+                'file': BytesIO(b'content'),
+                'content_type': 'text/plain',
+                'filename': f'Dokument {number}.txt',
+                'size': 7,
+            }
+            for number in range(5)
+        ), workers=3)
+
+        self.assertTrue(result.ok)
+        self.assertEqual(['Dokument 0', 'Dokument 1', 'Dokument 2', 'Dokument 3', 'Dokument 4'],
+                         [document.title for document in result.results])
+        self.assertIsInstance(result.results[0], Document)
+        self.assertDictContainsSubset({'items': 5, 'succeeded': 5, 'failed': 0},
+                                      result.metrics)
+
+    def test_bulk_create_documents_collects_failures(self):
+        client = GEVERClient(url=self.dossier_url, username=self.regular_user)
+        documents = [
+            {'title': 'Gut', 'file': BytesIO(b'content'), 'content_type': 'text/plain',
+             'filename': 'Gut.txt', 'size': 7},
+            {'title': 'Zu kurz', 'file': BytesIO(b'content'), 'content_type': 'text/plain',
+             'filename': 'Zu kurz.txt', 'size': 70},
+            {'title': 'Auch gut', 'file': BytesIO(b'content'), 'content_type': 'text/plain',
+             'filename': 'Auch gut.txt', 'size': 7},
+        ]
+        result = client.bulk_create_documents(documents, workers=2, raw=True)
+
+        self.assertFalse(result.ok)
+        self.assertEqual(['Gut', None, 'Auch gut'],
+                         [document and document['title'] for document in result.results])
+        self.assertEqual([1], list(result.errors))
+        self.assertIsInstance(result.errors[1], ValueError)
+        self.assertDictContainsSubset({'items': 3, 'succeeded': 2, 'failed': 1},
+                                      result.metrics)
+
     def test_accepts_headers(self):
         client = GEVERClient(url=self.dossier_url, username=self.regular_user, headers={'Accept-Language': 'fr-CH'})
         self.assertDictContainsSubset({'Accept-Language': 'fr-CH'}, client.session.headers)
@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+
+from . import TestCase
+
+
+class TestLazyImports(TestCase):
+
+    def imported_modules(self, statement):
+        code = (f'{statement}\n'
+                'import json, sys\n'
+                'print(json.dumps(sorted(sys.modules)))')
+        output = subprocess.check_output([sys.executable, '-c', code])
+        return set(json.loads(output))
+
+    def test_importing_the_package_is_cheap(self):
+        modules = self.imported_modules('import opengever.apiclient')
+        self.assertNotIn('requests', modules)
+        self.assertNotIn('jwt', modules)
+        self.assertNotIn('opengever.apiclient.client', modules)
+
+    def test_importing_the_client_does_not_import_jwt(self):
+        modules = self.imported_modules('from opengever.apiclient import GEVERClient')
+        self.assertIn('opengever.apiclient.client', modules)
+        self.assertNotIn('jwt', modules)
+        self.assertNotIn('cryptography', modules)
+
+    def test_keys_are_loaded_on_first_use(self):
+        modules = self.imported_modules(
+            'from opengever.apiclient.keys import KeyRegistry\n'
+            'assert KeyRegistry._keys is None\n'
+            'KeyRegistry.keys\n'
+            'assert KeyRegistry._keys is not None')
+        self.assertIn('opengever.apiclient.keys', modules)
@@ -0,0 +1,127 @@
+import threading
+
+import requests_mock
+
+from .. import GEVERClient
+from ..exceptions import APIRequestException
+from ..instrumentation import endpoint_template
+from ..instrumentation import HistogramCollector
+from ..keys import KeyRegistry
+from ..session import GEVERSession
+from . import TestCase
+
+
+class RecordingInstrument:
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event):
+        self.events.append(event)
+
+
+class TestInstrumentation(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.instrument = RecordingInstrument()
+        GEVERSession.instrument = self.instrument
+        self.addCleanup(setattr, GEVERSession, 'instrument', None)
+
+    def test_endpoint_template(self):
+        self.assertEqual('@listing', endpoint_template(f'{self.dossier_url}/@listing?name=documents'))
+        self.assertEqual('@ogds-users', endpoint_template(f'{self.root_url}@ogds-users/kathi.barfuss'))
+        self.assertEqual('@@download', endpoint_template(f'{self.document_url}/@@download'))
+        self.assertEqual('object', endpoint_template(self.document_url))
+
+    def test_request_events(self):
+        client = GEVERClient(self.dossier_url, self.regular_user)
+        with requests_mock.Mocker() as mocker:
+            mocker.get(f'{self.dossier_url}/@listing', json={'items': [], 'items_total': 0})
+            mocker.patch(self.dossier_url, status_code=204)
+            client.listing('documents')
+            client.update_object(title='Neu')
+
+        listing, patch = self.instrument.events
+        self.assertEqual(('@listing', 'GET', 200), (listing.endpoint, listing.method, listing.status))
+        self.assertEqual(len(b'{"items": [], "items_total": 0}'), listing.bytes_received)
+        self.assertEqual(0, listing.bytes_sent)
+        self.assertGreaterEqual(listing.duration, listing.ttfb)
+        self.assertIsNotNone(listing.body)
+        self.assertEqual(('object', 'PATCH', 204), (patch.endpoint, patch.method, patch.status))
+        self.assertEqual(len(b'{"title": "Neu"}'), patch.bytes_sent)
+
+    def test_failed_requests_are_reported(self):
+        client = GEVERClient(self.dossier_url, self.regular_user)
+        with requests_mock.Mocker() as mocker:
+            mocker.get(f'{self.dossier_url}/@sharing', status_code=401)
+            with self.assertRaises(APIRequestException):
+                client.sharing()
+
+        event, = self.instrument.events
+        self.assertEqual(('@sharing', 401), (event.endpoint, event.status))
+        self.assertIsNone(event.body)
+
+    def test_token_refresh_is_reported_with_the_next_request(self):
+        client = GEVERClient(self.dossier_url, self.regular_user)
+        session = client.session()
+        session.token_refreshed = False
+        token_uri = KeyRegistry.get_key_for(self.dossier_url)['token_uri']
+        with requests_mock.Mocker() as mocker:
+            mocker.get(f'{self.dossier_url}/@sharing', json={})
+            mocker.post(token_uri, json={'access_token': 'new'})
+            client.sharing()
+            session.gever_token_expiration = 0
+            client.sharing()
+
+        self.assertEqual([False, True], [event.token_refreshed for event in self.instrument.events])
+
+    def test_no_events_without_instrument(self):
+        GEVERSession.instrument = None
+        client = GEVERClient(self.dossier_url, self.regular_user)
+        with requests_mock.Mocker() as mocker:
+            mocker.get(f'{self.dossier_url}/@sharing', json={})
+            client.sharing()
+        self.assertEqual([], self.instrument.events)
+
+    def test_instrument_is_bound_per_thread(self):
+        GEVERSession.instrument = None
+        instrumented = GEVERSession(self.dossier_url, self.regular_user)
+        instrumented.instrument = self.instrument
+        plain = GEVERSession(self.dossier_url, self.regular_user)
+        with requests_mock.Mocker() as mocker:
+            mocker.get(self.dossier_url, json={})
+            session = instrumented()
+            # Another client of the user prepares the shared session meanwhile.
+            thread = threading.Thread(target=plain)
+            thread.start()
+            thread.join()
+            session.get(self.dossier_url)
+
+        self.assertIs(instrumented._session, plain._session)
+        self.assertEqual(1, len(self.instrument.events))
+
+
+class TestHistogramCollector(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.collector = HistogramCollector(buckets=[0.1, 1])
+        GEVERSession.instrument = self.collector
+        self.addCleanup(setattr, GEVERSession, 'instrument', None)
+
+    def test_prometheus_export(self):
+        client = GEVERClient(self.dossier_url, self.regular_user)
+        with requests_mock.Mocker() as mocker:
+            mocker.get(f'{self.dossier_url}/@sharing', text='{}')
+            client.sharing()
+            client.sharing()
+
+        text = self.collector.prometheus()
+        labels = 'endpoint="@sharing",method="GET",status="200"'
+        self.assertIn('# TYPE opengever_apiclient_request_duration_seconds histogram', text)
+        self.assertIn(f'opengever_apiclient_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2',
+                      text)
+        self.assertIn(f'opengever_apiclient_request_duration_seconds_count{{{labels}}} 2', text)
+        self.assertIn(f'opengever_apiclient_bytes_received_total{{{labels}}} 4', text)
+        self.assertIn(f'opengever_apiclient_retries_total{{{labels}}} 0', text)
@@ -0,0 +1,48 @@
+from unittest import skipUnless
+import importlib.util
+
+from ..jsoncodec import get_codec
+from ..jsoncodec import JSONCodec
+from . import TestCase
+
+
+def installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+class TestJSONCodec(TestCase):
+
+    payload = {'@id': 'http://localhost/dossier-1', 'title': 'Verträge', 'items_total': 2,
+               'items': [{'modified': None, 'is_folderish': True}]}
+
+    def assert_roundtrip(self, codec):
+        self.assertEqual(self.payload, codec.loads(codec.dumps(self.payload)))
+        self.assertEqual(self.payload, codec.loads(JSONCodec().dumps(self.payload)))
+
+    def test_stdlib_codec(self):
+        codec = get_codec('json')
+        self.assertEqual('json', codec.name)
+        self.assert_roundtrip(codec)
+
+    @skipUnless(installed('orjson'), 'orjson is not installed')
+    def test_orjson_codec(self):
+        self.assert_roundtrip(get_codec('orjson'))
+
+    @skipUnless(installed('ujson'), 'ujson is not installed')
+    def test_ujson_codec(self):
+        self.assert_roundtrip(get_codec('ujson'))
+
+    def test_fastest_installed_codec_is_selected(self):
+        expected = next(name for name in ('orjson', 'ujson', 'json')
+                        if name == 'json' or installed(name))
+        self.assertEqual(expected, get_codec().name)
+
+    def test_codec_is_configurable_with_environment_variable(self):
+        with self.env(OPENGEVER_APICLIENT_JSON_CODEC='json'):
+            self.assertEqual('json', get_codec().name)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError) as cm:
+            get_codec('simplejson')
+        self.assertEqual("Unknown JSON codec 'simplejson', expected one of orjson, ujson, json.",
+                         str(cm.exception))
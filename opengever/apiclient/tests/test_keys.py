@@ -1,6 +1,18 @@
 from . import TestCase
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
+from opengever.apiclient.async_session import ASYNC_SESSION_POOL
 from opengever.apiclient.keys import KeyRegistry
+from opengever.apiclient.session import GEVER_SESSION_POOL
+from opengever.apiclient.session import GEVERSession
+from opengever.apiclient.tokens import MemoryTokenStore
 from pathlib import Path
+from unittest import mock
+import asyncio
+import json
+import jwt
+import os
+import requests_mock
+import tempfile
 
 
 class TestKeyRegistry(TestCase):
@@ -52,3 +64,211 @@ class TestKeyRegistry(TestCase):
                     'user_id': 'ris.app',
                 },
                 KeyRegistry.get_key_for('http://gever.test/mandant/foo/bar/baz'))
+
+    def test_longest_base_url_wins(self):
+        test_key = json.loads((Path(__file__).parent / 'keys' / 'test-gever.json').read_text())
+        with tempfile.TemporaryDirectory() as directory:
+            for name, token_uri in (('plone', 'http://gever.test/plone/@@oauth2-token'),
+                                    ('plone2', 'http://gever.test/plone2/@@oauth2-token'),
+                                    ('nested', 'http://gever.test/plone/nested/@@oauth2-token')):
+                key = dict(test_key, token_uri=token_uri, client_id=name)
+                (Path(directory) / f'{name}.json').write_text(json.dumps(key))
+
+            with self.env(OPENGEVER_APICLIENT_KEY_DIRS=directory):
+                KeyRegistry.reset()
+
+        self.assertEqual('http://gever.test/plone/',
+                         KeyRegistry.get_base_url_for('http://gever.test/plone/foo'))
+        self.assertEqual('http://gever.test/plone2/',
+                         KeyRegistry.get_base_url_for('http://gever.test/plone2/foo'))
+        self.assertEqual('http://gever.test/plone/nested/',
+                         KeyRegistry.get_base_url_for('http://gever.test/plone/nested/foo'))
+        self.assertEqual('http://gever.test/plone/',
+                         KeyRegistry.get_base_url_for('http://gever.test/plone/nested-not'))
+        self.assertEqual('nested',
+                         KeyRegistry.get_key_for('http://gever.test/plone/nested/')['client_id'])
+        self.assertEqual(None, KeyRegistry.get_base_url_for('http://gever.test/plone'))
+
+    def test_sessions_are_not_responsible_for_nested_base_urls(self):
+        test_key = json.loads((Path(__file__).parent / 'keys' / 'test-gever.json').read_text())
+        with tempfile.TemporaryDirectory() as directory:
+            for name, token_uri in (('plone', 'http://gever.test/plone/@@oauth2-token'),
+                                    ('nested', 'http://gever.test/plone/nested/@@oauth2-token')):
+                key = dict(test_key, token_uri=token_uri, client_id=name)
+                (Path(directory) / f'{name}.json').write_text(json.dumps(key))
+
+            with self.env(OPENGEVER_APICLIENT_KEY_DIRS=directory):
+                KeyRegistry.reset()
+
+        with requests_mock.Mocker() as mocker:
+            mocker.post('http://gever.test/plone/@@oauth2-token', json={'access_token': 'token'})
+            session = GEVERSession('http://gever.test/plone/foo', 'john.doe')
+        self.assertTrue(session.is_responsible_for('http://gever.test/plone/bar', 'john.doe'))
+        self.assertFalse(session.is_responsible_for('http://gever.test/plone/bar', 'jane.doe'))
+        self.assertFalse(session.is_responsible_for('http://gever.test/plone/nested/bar',
+                                                    'john.doe'))
+
+    def test_lookups_are_invalidated_when_keys_change(self):
+        url = 'http://gever.test/mandant/foo/bar/baz'
+        with self.env(OPENGEVER_APICLIENT_KEY_DIRS=''):
+            KeyRegistry.reset()
+            self.assertEqual(None, KeyRegistry.get_base_url_for(url))
+            KeyRegistry.load_keys(str(Path(__file__).parent / 'keys'))
+            self.assertEqual('http://gever.test/mandant/', KeyRegistry.get_base_url_for(url))
+            KeyRegistry.clear()
+            self.assertEqual(None, KeyRegistry.get_base_url_for(url))
+
+    def test_get_signing_key_for(self):
+        with self.env(OPENGEVER_APICLIENT_KEY_DIRS=str(Path(__file__).parent / 'keys')):
+            KeyRegistry.reset()
+            self.assertEqual(None, KeyRegistry.get_signing_key_for('http://unknown/url'))
+            signing_key = KeyRegistry.get_signing_key_for('http://gever.test/mandant/foo')
+            self.assertIsInstance(signing_key, RSAPrivateKey)
+            self.assertIs(signing_key, KeyRegistry.get_signing_key_for('http://gever.test/mandant/'))
+
+            KeyRegistry.reset()
+            self.assertIsNot(signing_key, KeyRegistry.get_signing_key_for('http://gever.test/mandant/'))
+
+    def test_signing_key_signs_like_pem(self):
+        with self.env(OPENGEVER_APICLIENT_KEY_DIRS=str(Path(__file__).parent / 'keys')):
+            KeyRegistry.reset()
+            key = KeyRegistry.get_key_for('http://gever.test/mandant/')
+            signing_key = KeyRegistry.get_signing_key_for('http://gever.test/mandant/')
+
+        claims = {'sub': 'john.doe'}
+        self.assertEqual(jwt.encode(claims, key['private_key'], algorithm='RS256'),
+                         jwt.encode(claims, signing_key, algorithm='RS256'))
+
+
+class TestKeyRegistryReload(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.test_key = json.loads((Path(__file__).parent / 'keys' / 'test-gever.json').read_text())
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.write_key('first.json', 'http://gever.test/first/@@oauth2-token')
+        with self.env(OPENGEVER_APICLIENT_KEY_DIRS=self.directory.name):
+            KeyRegistry.reset()
+
+    def tearDown(self):
+        super().tearDown()
+        KeyRegistry.reset()
+
+    def write_key(self, name, token_uri, **data):
+        path = Path(self.directory.name) / name
+        path.write_text(json.dumps(dict(self.test_key, token_uri=token_uri, **data)))
+        # Make sure the modification is detected on filesystems with coarse mtimes.
+        stat = path.stat()
+        os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        return path
+
+    def reload(self):
+        with self.env(OPENGEVER_APICLIENT_KEY_DIRS=self.directory.name):
+            return KeyRegistry.reload()
+
+    def test_unchanged_files_are_not_reloaded(self):
+        keys = KeyRegistry.keys
+        self.assertEqual(set(), self.reload())
+        self.assertIs(keys, KeyRegistry.keys)
+
+    def test_added_changed_and_removed_files_are_reloaded(self):
+        self.write_key('second.json', 'http://gever.test/second/@@oauth2-token')
+        self.assertEqual({'http://gever.test/second/'}, self.reload())
+        self.assertEqual({'http://gever.test/first/', 'http://gever.test/second/'},
+                         set(KeyRegistry.keys))
+
+        self.write_key('first.json', 'http://gever.test/first/@@oauth2-token', client_id='new')
+        self.assertEqual({'http://gever.test/first/'}, self.reload())
+        self.assertEqual('new', KeyRegistry.get_key_for('http://gever.test/first/')['client_id'])
+
+        (Path(self.directory.name) / 'second.json').unlink()
+        self.assertEqual({'http://gever.test/second/'}, self.reload())
+        self.assertEqual(None, KeyRegistry.get_base_url_for('http://gever.test/second/foo'))
+
+    def test_renamed_token_uri_replaces_old_base_url(self):
+        self.write_key('first.json', 'http://gever.test/renamed/@@oauth2-token')
+        self.assertEqual({'http://gever.test/first/', 'http://gever.test/renamed/'},
+                         self.reload())
+        self.assertEqual({'http://gever.test/renamed/'}, set(KeyRegistry.keys))
+
+    def test_rotated_key_files_keep_the_base_url(self):
+        self.write_key('rotated.json', 'http://gever.test/first/@@oauth2-token', client_id='new')
+        (Path(self.directory.name) / 'first.json').unlink()
+        self.assertEqual({'http://gever.test/first/'}, self.reload())
+        self.assertEqual('new', KeyRegistry.get_key_for('http://gever.test/first/')['client_id'])
+        self.assertEqual(set(), self.reload())
+        self.assertEqual('new', KeyRegistry.get_key_for('http://gever.test/first/')['client_id'])
+
+    def test_unreadable_files_do_not_abort_the_reload(self):
+        broken = Path(self.directory.name) / 'broken.json'
+        broken.write_text('{"token_uri": ')
+        self.write_key('first.json', 'http://gever.test/first/@@oauth2-token', client_id='new')
+        with self.assertLogs('opengever.apiclient', 'ERROR'):
+            self.assertEqual({'http://gever.test/first/'}, self.reload())
+        self.assertEqual('new', KeyRegistry.get_key_for('http://gever.test/first/')['client_id'])
+
+        self.write_key('broken.json', 'http://gever.test/fixed/@@oauth2-token')
+        self.assertEqual({'http://gever.test/fixed/'}, self.reload())
+
+    def test_keys_of_unreadable_changed_files_are_kept(self):
+        (Path(self.directory.name) / 'first.json').write_text('{"token_uri": ')
+        with self.assertLogs('opengever.apiclient', 'ERROR'):
+            self.assertEqual(set(), self.reload())
+        self.assertIn('http://gever.test/first/', KeyRegistry.keys)
+
+    def test_sessions_of_changed_keys_are_invalidated(self):
+        self.write_key('second.json', 'http://gever.test/second/@@oauth2-token')
+        self.reload()
+        with requests_mock.Mocker() as mocker:
+            mocker.post(requests_mock.ANY, json={'access_token': 'token'})
+            first = GEVERSession('http://gever.test/first/', 'john.doe')
+            second = GEVERSession('http://gever.test/second/', 'john.doe')
+
+        self.write_key('first.json', 'http://gever.test/first/@@oauth2-token', client_id='new')
+        self.reload()
+        self.assertEqual({('http://gever.test/second/', 'john.doe')},
+                         set(GEVER_SESSION_POOL.sessions))
+        self.assertEqual(0, first._session.gever_token_expiration)
+        self.assertNotEqual(0, second._session.gever_token_expiration)
+
+    def test_stored_tokens_of_changed_keys_are_not_used(self):
+        store = MemoryTokenStore()
+        with mock.patch.object(GEVERSession, 'token_store', store), \
+                requests_mock.Mocker() as mocker:
+            token = mocker.post(requests_mock.ANY, [{'json': {'access_token': 'old'}},
+                                                    {'json': {'access_token': 'new'}}])
+            GEVERSession('http://gever.test/first/', 'john.doe')
+            self.write_key('first.json', 'http://gever.test/first/@@oauth2-token',
+                           client_id='new')
+            self.reload()
+            session = GEVERSession('http://gever.test/first/', 'john.doe')()
+
+        self.assertEqual('Bearer new', session.headers['Authorization'])
+        self.assertEqual(2, token.call_count)
+
+    def test_async_sessions_of_changed_keys_acquire_new_tokens(self):
+        session = mock.Mock(gever_token_expiration=1000)
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        ASYNC_SESSION_POOL.loops[loop] = {
+            'sessions': {('http://gever.test/first/', 'john.doe'): session}, 'locks': {}}
+        self.addCleanup(ASYNC_SESSION_POOL.clear)
+
+        self.write_key('first.json', 'http://gever.test/first/@@oauth2-token', client_id='new')
+        self.reload()
+        self.assertEqual(0, session.gever_token_expiration)
+
+    def test_watch_reloads_in_background(self):
+        with self.env(OPENGEVER_APICLIENT_KEY_DIRS=self.directory.name):
+            watcher = KeyRegistry.watch(interval=0.01)
+            try:
+                self.write_key('second.json', 'http://gever.test/second/@@oauth2-token')
+                for _ in range(100):
+                    if 'http://gever.test/second/' in KeyRegistry.keys:
+                        break
+                    watcher._stopped.wait(0.01)
+            finally:
+                watcher.stop()
+
+        self.assertIn('http://gever.test/second/', KeyRegistry.keys)
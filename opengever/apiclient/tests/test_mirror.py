@@ -0,0 +1,155 @@
+from pathlib import Path
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+import re
+import tempfile
+
+import requests_mock
+
+from .. import GEVERClient
+from ..mirror import Mirror
+from . import TestCase
+
+
+class FakeCatalog:
+    """Answers @search requests of the mirror from a dict of objects by UID.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.requests = []
+        # Called after each search, for changing the catalog meanwhile.
+        self.after_search = None
+
+    def add(self, uid, portal_type, modified, created='2016-01-01T00:00:00+00:00', **data):
+        self.objects[uid] = {'@id': f'http://gever/{uid}', '@type': portal_type,
+                             'UID': uid, 'modified': modified, 'created': created, **data}
+
+    def search(self, request, context):
+        query = parse_qs(urlsplit(request.url).query)
+        self.requests.append(query)
+        key = query['sort_on'][0]
+        items = sorted(self.objects.values(), key=lambda item: (item[key], item['UID']))
+        if f'{key}.query' in query:
+            items = [item for item in items if item[key] >= query[f'{key}.query'][0]]
+        if 'portal_type:list' in query:
+            items = [item for item in items if item['@type'] in query['portal_type:list']]
+        fields = query['metadata_fields:list']
+        if fields != ['_all']:
+            items = [dict({'@id': item['@id'], '@type': item['@type']},
+                          **{name: item[name] for name in fields})
+                     for item in items]
+
+        b_start = int(query['b_start:int'][0])
+        b_size = int(query['b_size:int'][0])
+        result = {'items_total': len(items), 'items': items[b_start:b_start + b_size]}
+        if self.after_search is not None:
+            self.after_search()
+        return result
+
+
+class TestMirror(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.client = GEVERClient(self.repository_url, self.regular_user)
+        self.mirror = Mirror(self.client, Path(directory.name, 'mirror.sqlite'))
+        self.mirror.batch_size = 2
+        self.addCleanup(self.mirror.close)
+
+        self.catalog = FakeCatalog()
+        self.catalog.add('dossier1', 'opengever.dossier.businesscasedossier',
+                         '2016-08-31T14:00:00+00:00', created='2016-01-01T00:00:00+00:00',
+                         title='Dossier', review_state='dossier-state-active')
+        self.catalog.add('document1', 'opengever.document.document',
+                         '2016-08-31T15:00:00+00:00', created='2016-01-02T00:00:00+00:00',
+                         title='Vertrag')
+        self.catalog.add('document2', 'opengever.document.document',
+                         '2016-08-31T16:00:00+00:00', created='2016-01-03T00:00:00+00:00',
+                         title='Offerte')
+
+        mocker = requests_mock.Mocker()
+        mocker.start()
+        self.addCleanup(mocker.stop)
+        mocker.get(re.compile(r'/@search'), json=self.catalog.search)
+
+    def test_sync_pulls_all_objects_initially(self):
+        self.assertEqual({'pulled': 3, 'deleted': 0}, self.mirror.sync())
+        self.assertEqual('2016-08-31T16:00:00+00:00', self.mirror.watermark)
+        self.assertEqual('Vertrag', self.mirror.get(uid='document1')['title'])
+        self.assertEqual('Vertrag', self.mirror.get(url='http://gever/document1/')['title'])
+        self.assertEqual(['Vertrag', 'Offerte'], [
+            item['title'] for item in self.mirror.objects(portal_type='opengever.document.document')])
+        self.assertEqual(['Dossier'], [
+            item['title'] for item in self.mirror.objects(review_state='dossier-state-active')])
+        # The initial sync has seen all objects, it does not reconcile again.
+        self.assertEqual({('_all',)}, {tuple(query['metadata_fields:list'])
+                                       for query in self.catalog.requests})
+
+    def test_sync_pulls_only_modified_objects(self):
+        self.mirror.sync()
+        self.catalog.add('document1', 'opengever.document.document',
+                         '2016-09-01T08:00:00+00:00', title='Vertrag v2')
+
+        self.assertEqual({'pulled': 2, 'deleted': 0}, self.mirror.sync())
+        self.assertEqual('2016-08-31T16:00:00+00:00',
+                         self.catalog.requests[-1]['modified.query'][0])
+        self.assertEqual('Vertrag v2', self.mirror.get(uid='document1')['title'])
+        self.assertEqual('2016-09-01T08:00:00+00:00', self.mirror.watermark)
+
+    def test_deletions_are_reconciled_when_due(self):
+        self.mirror.sync()
+        del self.catalog.objects['document2']
+
+        # The last reconciliation was just now.
+        self.assertEqual({'pulled': 0, 'deleted': 0}, self.mirror.sync())
+        self.assertIsNotNone(self.mirror.get(uid='document2'))
+
+        self.mirror.reconcile_interval = 0
+        self.assertEqual({'pulled': 0, 'deleted': 1}, self.mirror.sync())
+        self.assertIsNone(self.mirror.get(uid='document2'))
+        self.assertEqual(['UID', 'created'], self.catalog.requests[-1]['metadata_fields:list'])
+
+    def test_full_sync_removes_deleted_objects(self):
+        self.mirror.sync()
+        del self.catalog.objects['document2']
+        self.assertEqual({'pulled': 2, 'deleted': 1}, self.mirror.sync(full=True))
+        self.assertIsNone(self.mirror.get(uid='document2'))
+
+    def test_sync_does_not_skip_objects_modified_meanwhile(self):
+        def modify_dossier():
+            self.catalog.after_search = None
+            self.catalog.add('dossier1', 'opengever.dossier.businesscasedossier',
+                             '2016-08-31T17:00:00+00:00', title='Dossier v2')
+
+        self.catalog.after_search = modify_dossier
+        self.mirror.sync()
+        self.assertEqual(['Vertrag', 'Offerte', 'Dossier v2'],
+                         [item['title'] for item in self.mirror.objects()])
+        self.assertEqual('2016-08-31T17:00:00+00:00', self.mirror.watermark)
+
+    def test_sync_pages_objects_with_the_same_modification_date(self):
+        for uid in ('document3', 'document4', 'document5'):
+            self.catalog.add(uid, 'opengever.document.document', '2016-08-31T16:00:00+00:00')
+        self.assertEqual({'pulled': 6, 'deleted': 0}, self.mirror.sync())
+
+    def test_reconcile_does_not_skip_objects_when_objects_are_deleted_meanwhile(self):
+        self.mirror.sync()
+        self.mirror.reconcile_batch_size = 2
+
+        def delete_dossier():
+            self.catalog.after_search = None
+            del self.catalog.objects['dossier1']
+
+        self.catalog.after_search = delete_dossier
+        self.assertEqual(0, self.mirror.reconcile())
+        self.assertIsNotNone(self.mirror.get(uid='document2'))
+        self.assertEqual(1, self.mirror.reconcile())
+        self.assertIsNone(self.mirror.get(uid='dossier1'))
+
+    def test_portal_types(self):
+        self.mirror.portal_types = ['opengever.dossier.businesscasedossier']
+        self.assertEqual({'pulled': 1, 'deleted': 0}, self.mirror.sync())
+        self.assertEqual(['Dossier'], [item['title'] for item in self.mirror.objects()])
@@ -0,0 +1,116 @@
+from pathlib import Path
+from unittest import mock
+import json
+import tempfile
+import time
+
+import requests_mock
+
+from .. import GEVERClient
+from ..exceptions import APIRequestException
+from ..exceptions import NoRecordedResponse
+from ..recording import load_recording
+from ..recording import Recorder
+from ..recording import REDACTED
+from ..recording import ReplayAdapter
+from ..session import GEVERSession
+from . import TestCase
+
+
+class TestRecording(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = Path(self.directory.name, 'recording.jsonl')
+
+    def record(self, callback):
+        with Recorder(self.path) as recorder:
+            with mock.patch.object(GEVERSession, 'recorder', recorder):
+                with requests_mock.Mocker() as mocker:
+                    mocker.get(f'{self.dossier_url}/@sharing',
+                               json={'items': [], 'access_token': 'secret'},
+                               headers={'Set-Cookie': '__ac=secret'})
+                    mocker.get(f'{self.document_url}/@@download', content=b'\xff\xfe',
+                               headers={'Content-Type': 'application/octet-stream'})
+                    mocker.get(f'{self.dossier_url}/@groups/missing', status_code=404,
+                               json={'message': 'Not found'})
+                    mocker.get(f'{self.dossier_url}/@listing', json={
+                        'items_total': 1,
+                        'items': [{'@id': self.document_url, 'title': 'Vertrag',
+                                   '@type': 'opengever.document.document'}]})
+                    callback()
+        return load_recording(self.path)
+
+    def test_requests_are_recorded_with_secrets_redacted(self):
+        client = GEVERClient(self.dossier_url, self.regular_user)
+        sharing, = self.record(client.sharing)
+
+        self.assertEqual('GET', sharing['method'])
+        self.assertEqual(f'{self.dossier_url}/@sharing', sharing['url'])
+        self.assertEqual(200, sharing['status'])
+        self.assertEqual(REDACTED, sharing['request_headers']['Authorization'])
+        self.assertEqual(REDACTED, sharing['response_headers']['Set-Cookie'])
+        self.assertEqual({'items': [], 'access_token': REDACTED}, json.loads(sharing['body']))
+        self.assertGreaterEqual(sharing['duration'], 0)
+        self.assertNotIn('secret', self.path.read_text())
+
+    def test_binary_and_failed_responses_are_recorded(self):
+        client = GEVERClient(self.dossier_url, self.regular_user)
+
+        def requests():
+            client.session().get(f'{self.document_url}/@@download')
+            with self.assertRaises(APIRequestException):
+                client.group('missing')
+
+        download, group = self.record(requests)
+        self.assertEqual('//4=', download['body_base64'])
+        self.assertEqual(404, group['status'])
+
+    def test_streamed_responses_are_still_readable(self):
+        client = GEVERClient(self.dossier_url, self.regular_user)
+        items = []
+
+        def iter_listing():
+            items.extend(client.iter_listing('documents', raw=True, incremental=True))
+
+        listing, = self.record(iter_listing)
+        self.assertEqual(['Vertrag'], [item['title'] for item in items])
+        self.assertEqual(1, json.loads(listing['body'])['items_total'])
+
+    def test_replay(self):
+        client = GEVERClient(self.dossier_url, self.regular_user)
+        self.record(client.sharing)
+
+        with mock.patch.object(GEVERSession, 'transport', ReplayAdapter(self.path)):
+            GEVERSession.clear()
+            self.addCleanup(GEVERSession.clear)
+            client = GEVERClient(self.dossier_url, self.regular_user)
+            self.assertEqual({'items': [], 'access_token': REDACTED}, client.sharing())
+            # Exhausted recordings are served again.
+            self.assertEqual({'items': [], 'access_token': REDACTED}, client.sharing())
+
+            with self.assertRaises(NoRecordedResponse):
+                client.fetch()
+
+    def test_replay_serves_recorded_responses_in_order(self):
+        entries = [{'method': 'GET', 'url': 'http://gever/a', 'status': 200,
+                    'duration': 0, 'body': body} for body in ('1', '2')]
+        adapter = ReplayAdapter(entries)
+        request = mock.Mock(method='GET', url='http://gever/a')
+        self.assertEqual([b'1', b'2', b'2'],
+                         [adapter.send(request).content for _ in range(3)])
+
+    def test_replay_with_original_timing(self):
+        entries = [{'method': 'GET', 'url': 'http://gever/a', 'status': 200,
+                    'duration': 0.05, 'body': '{}'}]
+        request = mock.Mock(method='GET', url='http://gever/a')
+
+        start = time.monotonic()
+        ReplayAdapter(entries, timing='original').send(request)
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+        start = time.monotonic()
+        ReplayAdapter(entries, timing='fast').send(request)
+        self.assertLess(time.monotonic() - start, 0.05)
@@ -0,0 +1,55 @@
+import requests_mock
+
+from ..refresher import TokenRefresher
+from ..session import GEVERSession
+from ..session import unfrozen_time
+from . import TestCase
+
+
+class TestTokenRefresher(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mocker = requests_mock.Mocker()
+        self.mocker.start()
+        self.addCleanup(self.mocker.stop)
+        self.token = self.mocker.post(f'{self.plone_url}@@oauth2-token', [
+            {'json': {'access_token': 'first'}},
+            {'json': {'access_token': 'second'}},
+        ])
+        self.session = GEVERSession(f'{self.plone_url}ordnungssystem/', self.regular_user)
+
+    def test_renews_tokens_expiring_soon(self):
+        self.session().gever_token_expiration = unfrozen_time() + 120
+        self.assertEqual(1, TokenRefresher(refresh_ahead_seconds=300).refresh_expiring())
+
+        self.assertEqual(2, self.token.call_count)
+        self.assertEqual('Bearer second', self.session().headers['Authorization'])
+        self.assertGreater(self.session().gever_token_expiration, unfrozen_time() + 300)
+
+    def test_keeps_tokens_not_expiring_soon(self):
+        self.assertEqual(0, TokenRefresher(refresh_ahead_seconds=300).refresh_expiring())
+        self.assertEqual(1, self.token.call_count)
+        self.assertEqual('Bearer first', self.session().headers['Authorization'])
+
+    def test_keeps_old_token_when_refresh_fails(self):
+        self.mocker.post(f'{self.plone_url}@@oauth2-token', status_code=500)
+        self.session().gever_token_expiration = unfrozen_time() + 120
+        with self.assertLogs(level='ERROR'):
+            self.assertEqual(0, TokenRefresher(refresh_ahead_seconds=300).refresh_expiring())
+        self.assertEqual('Bearer first', self.session().headers['Authorization'])
+
+    def test_refreshes_in_background_thread(self):
+        self.session().gever_token_expiration = unfrozen_time() + 120
+        refresher = TokenRefresher(interval=0.01).start()
+        try:
+            self.assertTrue(refresher.running)
+            for _ in range(100):
+                if self.token.call_count == 2:
+                    break
+                refresher._stopped.wait(0.01)
+        finally:
+            refresher.stop()
+
+        self.assertFalse(refresher.running)
+        self.assertEqual('Bearer second', self.session().headers['Authorization'])
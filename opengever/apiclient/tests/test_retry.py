@@ -0,0 +1,144 @@
+from io import BytesIO
+from unittest import mock
+
+from requests.adapters import HTTPAdapter
+import requests
+
+from ..exceptions import CircuitOpen
+from ..retry import CircuitBreaker
+from ..retry import RETRY_METRICS
+from ..retry import RetryingAdapter
+from ..retry import RetryPolicy
+from . import TestCase
+
+
+def make_response(status_code, headers={}):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers)
+    response.raw = BytesIO(b'')
+    return response
+
+
+class NoSleepRetryPolicy(RetryPolicy):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+class TestRetryingAdapter(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        RETRY_METRICS.reset()
+        self.policy = NoSleepRetryPolicy(max_retries=3)
+
+    def send(self, adapter, method='GET', **kwargs):
+        request = requests.Request(method, 'http://gever.test/mandant/', **kwargs).prepare()
+        return adapter.send(request)
+
+    def test_retries_idempotent_requests(self):
+        adapter = RetryingAdapter(retry_policy=self.policy)
+        with mock.patch.object(HTTPAdapter, 'send', side_effect=[
+                make_response(503), make_response(502), make_response(200)]) as send:
+            response = self.send(adapter)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, send.call_count)
+        self.assertEqual(2, response.gever_retries)
+        self.assertEqual(2, RETRY_METRICS['retries'])
+        self.assertEqual(2, len(self.policy.sleeps))
+
+    def test_does_not_retry_post_requests(self):
+        adapter = RetryingAdapter(retry_policy=self.policy)
+        with mock.patch.object(HTTPAdapter, 'send', side_effect=[
+                make_response(503), make_response(200)]) as send:
+            response = self.send(adapter, method='POST', data={'title': 'Foo'})
+
+        self.assertEqual(503, response.status_code)
+        self.assertEqual(1, send.call_count)
+
+    def test_gives_up_after_max_retries(self):
+        adapter = RetryingAdapter(retry_policy=self.policy)
+        with mock.patch.object(HTTPAdapter, 'send', return_value=make_response(504)) as send:
+            response = self.send(adapter)
+
+        self.assertEqual(504, response.status_code)
+        self.assertEqual(4, send.call_count)
+
+    def test_retries_connection_errors(self):
+        adapter = RetryingAdapter(retry_policy=self.policy)
+        with mock.patch.object(HTTPAdapter, 'send', side_effect=[
+                requests.exceptions.ConnectionError(), make_response(200)]):
+            self.assertEqual(200, self.send(adapter).status_code)
+
+        with mock.patch.object(HTTPAdapter, 'send',
+                               side_effect=requests.exceptions.ConnectionError()) as send:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                self.send(adapter)
+        self.assertEqual(4, send.call_count)
+
+    def test_honors_retry_after(self):
+        adapter = RetryingAdapter(retry_policy=self.policy)
+        with mock.patch.object(HTTPAdapter, 'send', side_effect=[
+                make_response(429, {'Retry-After': '7'}), make_response(200)]):
+            self.send(adapter)
+        self.assertEqual([7], self.policy.sleeps)
+
+    def test_backoff_is_exponential_with_jitter(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+        for attempt, limit in ((0, 1), (1, 2), (2, 4), (3, 5), (10, 5)):
+            self.assertLessEqual(policy.backoff(attempt), limit)
+            self.assertGreaterEqual(policy.backoff(attempt), 0)
+
+        response = make_response(503, {'Retry-After': '120'})
+        self.assertEqual(5, policy.backoff(0, response))
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker('http://gever.test/mandant/', failure_threshold=2,
+                                 recovery_timeout=60)
+        adapter = RetryingAdapter(circuit_breaker=breaker)
+        with mock.patch.object(HTTPAdapter, 'send', return_value=make_response(500)) as send:
+            self.send(adapter)
+            self.send(adapter)
+            with self.assertLogs(level='ERROR'), self.assertRaises(CircuitOpen) as cm:
+                self.send(adapter)
+
+        self.assertEqual(2, send.call_count)
+        self.assertTrue(breaker.is_open)
+        self.assertEqual(1, RETRY_METRICS['circuit_trips'])
+        self.assertEqual(1, RETRY_METRICS['circuit_rejections'])
+        self.assertIn('http://gever.test/mandant/ is unavailable', str(cm.exception))
+
+    def test_circuit_recovers_after_successful_trial(self):
+        breaker = CircuitBreaker('http://gever.test/mandant/', failure_threshold=1,
+                                 recovery_timeout=0)
+        adapter = RetryingAdapter(circuit_breaker=breaker)
+        with mock.patch.object(HTTPAdapter, 'send', side_effect=[
+                make_response(503), make_response(503), make_response(200)]):
+            self.send(adapter)
+            self.assertTrue(breaker.is_open)
+            self.send(adapter)  # The failing trial keeps the circuit open.
+            self.assertTrue(breaker.is_open)
+            self.send(adapter)
+
+        self.assertFalse(breaker.is_open)
+        self.assertEqual(1, RETRY_METRICS['circuit_recoveries'])
+
+    def test_other_errors_end_the_trial(self):
+        breaker = CircuitBreaker('http://gever.test/mandant/', failure_threshold=1,
+                                 recovery_timeout=0)
+        adapter = RetryingAdapter(circuit_breaker=breaker)
+        with mock.patch.object(HTTPAdapter, 'send', side_effect=[
+                make_response(503), requests.exceptions.InvalidHeader(), make_response(200)]):
+            self.send(adapter)
+            with self.assertRaises(requests.exceptions.InvalidHeader):
+                self.send(adapter)
+            self.assertFalse(breaker.trial_running)
+            self.send(adapter)
+
+        self.assertFalse(breaker.is_open)
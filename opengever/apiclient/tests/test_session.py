@@ -1,9 +1,17 @@
+from freezegun import freeze_time
+import jwt
 import requests_mock
+import threading
+import time
 
 from . import TestCase
 from ..exceptions import AuthorizationFailed
 from ..exceptions import ServiceKeyMissing
 from ..keys import KeyRegistry
+from ..session import GEVER_SESSION_POOL
+from ..session import get_version
+from ..session import unfrozen_time
+from ..retry import RetryingAdapter
 from ..session import GEVERSession
 
 
@@ -49,3 +57,92 @@ class TestGeverSessionManager(TestCase):
             self.assertRegex(
                 manager().headers.get('User-Agent'),
                 r'^opengever.apiclient/[0-9.]+.dev0 Baumverwaltung/7.0')
+
+    def test_session_is_shared_between_threads(self):
+        sessions = []
+
+        def make_session():
+            manager = GEVERSession(f'{self.plone_url}ordnungssystem/', 'john.doe')
+            sessions.append(manager())
+
+        threads = [threading.Thread(target=make_session) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(5, len(sessions))
+        self.assertEqual(1, len(set(map(id, sessions))))
+
+    def test_token_is_acquired_once_for_concurrent_threads(self):
+        with requests_mock.Mocker() as mocker:
+            token = mocker.post(f'{self.plone_url}@@oauth2-token',
+                                json={'access_token': 'the-token'})
+            threads = [
+                threading.Thread(target=GEVERSession,
+                                 args=(f'{self.plone_url}ordnungssystem/', 'john.doe'))
+                for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(1, token.call_count)
+
+    def test_sessions_are_pooled_per_user(self):
+        john = GEVERSession(f'{self.plone_url}ordnungssystem/', 'john.doe')
+        jane = GEVERSession(f'{self.plone_url}ordnungssystem/', 'jane.doe')
+        self.assertIsNot(john(), jane())
+        self.assertIs(john(), GEVERSession(f'{self.plone_url}', 'john.doe')())
+
+    def test_requests_are_retried_and_guarded_by_circuit_breaker(self):
+        session = GEVERSession(f'{self.plone_url}ordnungssystem/', 'john.doe')()
+        adapter = session.get_adapter(self.plone_url)
+        self.assertIsInstance(adapter, RetryingAdapter)
+        self.assertIs(GEVERSession.retry_policy, adapter.retry_policy)
+        self.assertEqual(self.plone_url, adapter.circuit_breaker.base_url)
+        self.assertIs(adapter.circuit_breaker,
+                      GEVERSession(self.plone_url, 'jane.doe')().get_adapter(self.plone_url).circuit_breaker)
+
+    def test_prewarm_acquires_tokens_of_users(self):
+        with requests_mock.Mocker() as mocker:
+            token = mocker.post(f'{self.plone_url}@@oauth2-token',
+                                json={'access_token': 'the-token'})
+            result = GEVERSession.prewarm(f'{self.plone_url}ordnungssystem/',
+                                          ['john.doe', 'jane.doe', 'john.doe'], workers=2)
+
+        self.assertTrue(result.ok)
+        self.assertEqual(['john.doe', 'jane.doe'],
+                         [session.username for session in result.results])
+        self.assertEqual(2, token.call_count)
+        self.assertEqual({(self.plone_url, 'john.doe'), (self.plone_url, 'jane.doe')},
+                         set(GEVER_SESSION_POOL.sessions))
+
+    def test_prewarm_collects_failures(self):
+        def respond(request, context):
+            if 'jane.doe' in str(jwt.decode(request.text.split('assertion=')[1],
+                                            options={'verify_signature': False})):
+                context.status_code = 500
+            return {'access_token': 'the-token'}
+
+        with requests_mock.Mocker() as mocker:
+            mocker.post(f'{self.plone_url}@@oauth2-token', json=respond)
+            with self.assertLogs(level='ERROR'):
+                result = GEVERSession.prewarm(self.plone_url, ['john.doe', 'jane.doe'])
+
+        self.assertEqual(['jane.doe'], list(result.errors))
+        self.assertIsInstance(result.errors['jane.doe'], AuthorizationFailed)
+        self.assertEqual('john.doe', result.results[0].username)
+
+    def test_prewarm_requires_key(self):
+        with self.assertRaises(ServiceKeyMissing):
+            GEVERSession.prewarm('http://gever.example.com/fd/', ['john.doe'])
+
+    def test_version(self):
+        self.assertRegex(get_version(), r'^[0-9.]+')
+        from .. import session
+        self.assertEqual(get_version(), session.API_CLIENT_VERSION)
+
+    def test_unfrozen_time_ignores_frozen_time(self):
+        with freeze_time('2010-01-01'):
+            self.assertGreater(unfrozen_time(), time.time() + 3600)
@@ -0,0 +1,103 @@
+from pathlib import Path
+from unittest import mock
+import os
+import stat
+import tempfile
+
+import requests_mock
+
+from ..session import GEVERSession
+from ..session import unfrozen_time
+from ..tokens import get_env_token_store
+from ..tokens import MemoryTokenStore
+from ..tokens import RedisTokenStore
+from ..tokens import SQLiteTokenStore
+from . import TestCase
+
+
+class FakeRedis:
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key, (None,))[0]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value, ex)
+
+
+class TestTokenStores(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_memory_store(self):
+        store = MemoryTokenStore()
+        self.assertIsNone(store.get('http://gever.test/', 'john.doe'))
+        store.set('http://gever.test/', 'john.doe', 'token', 1234)
+        self.assertEqual(('token', 1234), store.get('http://gever.test/', 'john.doe'))
+        self.assertIsNone(store.get('http://gever.test/', 'jane.doe'))
+
+    def test_sqlite_store_is_shared_through_the_file(self):
+        path = Path(self.directory.name) / 'tokens.sqlite'
+        SQLiteTokenStore(path).set('http://gever.test/', 'john.doe', 'token', 1234)
+        SQLiteTokenStore(path).set('http://gever.test/', 'john.doe', 'newer', 5678)
+        self.assertEqual(('newer', 5678), SQLiteTokenStore(path).get('http://gever.test/', 'john.doe'))
+        self.assertIsNone(SQLiteTokenStore(path).get('http://gever.test/', 'jane.doe'))
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(path).st_mode))
+
+    def test_redis_store(self):
+        redis = FakeRedis()
+        store = RedisTokenStore(redis)
+        store.set('http://gever.test/', 'john.doe', 'token', int(unfrozen_time()) + 100)
+        self.assertEqual('token', store.get('http://gever.test/', 'john.doe')[0])
+        value, expires_in = redis.data['opengever.apiclient:token:http://gever.test/:john.doe']
+        self.assertIn(expires_in, (99, 100))
+
+        store.set('http://gever.test/', 'jane.doe', 'expired', int(unfrozen_time()) - 1)
+        self.assertIsNone(store.get('http://gever.test/', 'jane.doe'))
+
+    def test_env_token_store(self):
+        path = str(Path(self.directory.name) / 'tokens.sqlite')
+        with self.env(OPENGEVER_APICLIENT_TOKEN_CACHE=''):
+            self.assertIsNone(get_env_token_store())
+        with self.env(OPENGEVER_APICLIENT_TOKEN_CACHE=path):
+            self.assertIsInstance(get_env_token_store(), SQLiteTokenStore)
+            self.assertIs(get_env_token_store(), get_env_token_store())
+            self.assertEqual(path, get_env_token_store().path)
+
+
+class TestSessionWithTokenStore(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.store = MemoryTokenStore()
+        patcher = mock.patch.object(GEVERSession, 'token_store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mocker = requests_mock.Mocker()
+        self.mocker.start()
+        self.addCleanup(self.mocker.stop)
+        self.token = self.mocker.post(f'{self.plone_url}@@oauth2-token',
+                                      json={'access_token': 'acquired'})
+
+    def test_acquired_tokens_are_stored(self):
+        GEVERSession(self.plone_url, self.regular_user)
+        token, expiration = self.store.get(self.plone_url, self.regular_user)
+        self.assertEqual('acquired', token)
+        self.assertGreater(expiration, unfrozen_time())
+
+    def test_stored_tokens_are_reused(self):
+        self.store.set(self.plone_url, self.regular_user, 'stored', int(unfrozen_time()) + 600)
+        session = GEVERSession(self.plone_url, self.regular_user)
+        self.assertEqual('Bearer stored', session().headers['Authorization'])
+        self.assertEqual(0, self.token.call_count)
+
+    def test_expiring_stored_tokens_are_not_reused(self):
+        self.store.set(self.plone_url, self.regular_user, 'stored', int(unfrozen_time()) + 30)
+        session = GEVERSession(self.plone_url, self.regular_user)
+        self.assertEqual('Bearer acquired', session().headers['Authorization'])
+        self.assertEqual(1, self.token.call_count)
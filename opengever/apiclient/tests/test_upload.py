@@ -0,0 +1,114 @@
+from io import BytesIO
+
+import requests
+import requests_mock
+
+from ..exceptions import APIRequestException
+from ..session import GEVERSession
+from ..upload import ChunkedUpload
+from . import TestCase
+
+
+class TestChunkedUpload(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.location = f'{self.plone_url}ordnungssystem/@tus-upload/1234'
+        self.mocker = requests_mock.Mocker()
+        self.mocker.start()
+        self.addCleanup(self.mocker.stop)
+        self.mocker.post(f'{self.plone_url}@@oauth2-token', json={'access_token': 'token'})
+        self.session = GEVERSession(self.location, self.regular_user)
+
+    def patch_requests(self):
+        return [(request.headers['Upload-Offset'], request.body)
+                for request in self.mocker.request_history
+                if request.method == 'PATCH']
+
+    def test_uploads_in_chunks(self):
+        self.mocker.patch(self.location, [
+            {'status_code': 204},
+            {'status_code': 204},
+            {'status_code': 204, 'headers': {'Location': 'http://created'}},
+        ])
+        progress = []
+        response = ChunkedUpload(self.session, self.location, BytesIO(b'0123456789abc'), 13,
+                                 chunk_size=5, progress=lambda *args: progress.append(args))()
+
+        self.assertEqual('http://created', response.headers['Location'])
+        self.assertEqual([('0', b'01234'), ('5', b'56789'), ('10', b'abc')],
+                         self.patch_requests())
+        self.assertEqual([(5, 13), (10, 13), (13, 13)], progress)
+
+    def test_uploads_iterables(self):
+        self.mocker.patch(self.location, [
+            {'status_code': 204},
+            {'status_code': 204, 'headers': {'Location': 'http://created'}},
+        ])
+        ChunkedUpload(self.session, self.location, iter([b'012', b'3456', b'78']), 9,
+                      chunk_size=5)()
+        self.assertEqual([('0', b'01234'), ('5', b'5678')], self.patch_requests())
+
+    def test_uploads_bytes(self):
+        self.mocker.patch(self.location, [
+            {'status_code': 204},
+            {'status_code': 204, 'headers': {'Location': 'http://created'}},
+        ])
+        ChunkedUpload(self.session, self.location, b'012345678', 9, chunk_size=5)()
+        self.assertEqual([('0', b'01234'), ('5', b'5678')], self.patch_requests())
+
+    def test_resumes_seekable_file_at_server_offset(self):
+        self.mocker.patch(self.location, [
+            {'status_code': 204},
+            {'exc': requests.exceptions.ConnectionError},
+            {'status_code': 204},
+            {'status_code': 204, 'headers': {'Location': 'http://created'}},
+        ])
+        self.mocker.head(self.location, headers={'Upload-Offset': '5'})
+        ChunkedUpload(self.session, self.location, BytesIO(b'0123456789abc'), 13,
+                      chunk_size=5)()
+        self.assertEqual(
+            [('0', b'01234'), ('5', b'56789'), ('5', b'56789'), ('10', b'abc')],
+            self.patch_requests())
+
+    def test_failing_resume_counts_as_attempt(self):
+        self.mocker.patch(self.location, [
+            {'exc': requests.exceptions.ConnectionError},
+            {'status_code': 204},
+            {'status_code': 204, 'headers': {'Location': 'http://created'}},
+        ])
+        self.mocker.head(self.location, [
+            {'exc': requests.exceptions.ConnectionError},
+            {'headers': {'Upload-Offset': '0'}},
+        ])
+        ChunkedUpload(self.session, self.location, BytesIO(b'0123456789'), 10,
+                      chunk_size=5, retries=2)()
+        self.assertEqual([('0', b'01234'), ('0', b'01234'), ('5', b'56789')],
+                         self.patch_requests())
+
+    def test_resumes_iterable_within_failed_chunk(self):
+        self.mocker.patch(self.location, [
+            {'status_code': 503},
+            {'status_code': 204},
+            {'status_code': 204, 'headers': {'Location': 'http://created'}},
+        ])
+        self.mocker.head(self.location, headers={'Upload-Offset': '2'})
+        with self.assertLogs(level='ERROR'):
+            ChunkedUpload(self.session, self.location, iter([b'0123456789']), 10,
+                          chunk_size=5)()
+        self.assertEqual([('0', b'01234'), ('2', b'234'), ('5', b'56789')],
+                         self.patch_requests())
+
+    def test_gives_up_after_retries(self):
+        self.mocker.patch(self.location, status_code=503)
+        self.mocker.head(self.location, headers={'Upload-Offset': '0'})
+        with self.assertLogs(level='ERROR'), self.assertRaises(APIRequestException):
+            ChunkedUpload(self.session, self.location, BytesIO(b'0123456789'), 10,
+                          chunk_size=5, retries=2)()
+        self.assertEqual(3, len(self.patch_requests()))
+
+    def test_fails_when_file_is_shorter_than_size(self):
+        self.mocker.patch(self.location, status_code=204)
+        with self.assertRaisesRegex(ValueError, 'File ended after 5 of 10 bytes'):
+            ChunkedUpload(self.session, self.location, BytesIO(b'01234'), 10,
+                          chunk_size=5)()
@@ -0,0 +1,129 @@
+from contextlib import closing
+from pathlib import Path
+import json
+import os
+import sqlite3
+import threading
+
+
+class TokenStore:
+    """A token store keeps bearer tokens by GEVER base URL and username, so that
+    they can be reused until they expire, e.g. by other processes.
+
+    Token stores implement ``get`` and ``set``; the expiration is a unix timestamp.
+    """
+
+    def get(self, base_url, username):
+        """Returns a tuple of token and expiration, or None.
+        """
+        raise NotImplementedError()
+
+    def set(self, base_url, username, token, expiration):
+        raise NotImplementedError()
+
+
+class MemoryTokenStore(TokenStore):
+    """Keeps the tokens in the memory of the process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tokens = {}
+
+    def get(self, base_url, username):
+        with self._lock:
+            return self.tokens.get((base_url, username))
+
+    def set(self, base_url, username, token, expiration):
+        with self._lock:
+            self.tokens[(base_url, username)] = (token, expiration)
+
+
+class SQLiteTokenStore(TokenStore):
+    """Keeps the tokens in an SQLite file, which is shared by all processes of
+    the host using the same path. SQLite's file locking serializes the writes.
+    The file is only readable by its owner.
+    """
+
+    timeout = 10
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._setup()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def _setup(self):
+        path = Path(self.path)
+        if not path.exists():
+            path.touch(mode=0o600)
+
+        with closing(self._connect()) as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS tokens ('
+                ' base_url TEXT NOT NULL,'
+                ' username TEXT NOT NULL,'
+                ' token TEXT NOT NULL,'
+                ' expiration INTEGER NOT NULL,'
+                ' PRIMARY KEY (base_url, username))')
+
+    def get(self, base_url, username):
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                'SELECT token, expiration FROM tokens WHERE base_url = ? AND username = ?',
+                (base_url, username)).fetchone()
+        return tuple(row) if row else None
+
+    def set(self, base_url, username, token, expiration):
+        with closing(self._connect()) as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO tokens (base_url, username, token, expiration)'
+                ' VALUES (?, ?, ?, ?)',
+                (base_url, username, token, expiration))
+
+
+class RedisTokenStore(TokenStore):
+    """Keeps the tokens in Redis or any backend with a Redis-like client, which
+    offers ``get(key)`` and ``set(key, value, ex=seconds)``.
+    The entries expire together with the tokens.
+    """
+
+    prefix = 'opengever.apiclient:token:'
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, base_url, username):
+        return f'{self.prefix}{base_url}:{username}'
+
+    def get(self, base_url, username):
+        value = self.client.get(self._key(base_url, username))
+        if value is None:
+            return None
+        data = json.loads(value)
+        return data['token'], data['expiration']
+
+    def set(self, base_url, username, token, expiration):
+        from .session import unfrozen_time
+        seconds = int(expiration - unfrozen_time())
+        if seconds <= 0:
+            return
+        self.client.set(self._key(base_url, username),
+                        json.dumps({'token': token, 'expiration': expiration}),
+                        ex=seconds)
+
+
+_ENV_STORES = {}
+
+
+def get_env_token_store():
+    """Returns the SQLiteTokenStore configured by the environment variable
+    OPENGEVER_APICLIENT_TOKEN_CACHE, or None.
+    """
+    path = os.environ.get('OPENGEVER_APICLIENT_TOKEN_CACHE')
+    if not path:
+        return None
+    if path not in _ENV_STORES:
+        _ENV_STORES[path] = SQLiteTokenStore(path)
+    return _ENV_STORES[path]
@@ -0,0 +1,132 @@
+from io import BytesIO
+
+from requests.exceptions import RequestException
+
+from .exceptions import APIRequestException
+
+
+TUS_VERSION = '1.0.0'
+
+
+class ChunkedUpload:
+    """The chunked upload sends the content of a file to a ``@tus-upload`` location
+    in chunks of a limited size.
+
+    The file may be bytes, a readable IO or any iterable of bytes; it is read chunk by
+    chunk and never held in memory as a whole. When sending a chunk fails, the
+    offset the server has actually received is requested with a HEAD request and
+    the upload is resumed from there. Seekable files can be resumed from any offset,
+    other sources only from within the chunk which has failed.
+    """
+
+    def __init__(self, session, location, file, size, chunk_size, retries=3, progress=None):
+        """
+        :param session: The GEVERSession used for the requests.
+        :param location: The upload location returned by ``@tus-upload``.
+        :param file: Bytes, readable IO or iterable of bytes.
+        :param size: The total size of the upload in bytes.
+        :param chunk_size: The maximum number of bytes sent per request.
+        :param retries: How many times a failing chunk is resumed.
+        :param progress: Optional callable, called with the number of uploaded
+          bytes and the total size after each chunk.
+        """
+        self.session = session
+        self.location = location
+        if isinstance(file, (bytes, bytearray, memoryview)):
+            file = BytesIO(file)
+        self.file = file
+        self.size = int(size)
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.progress = progress
+        self.offset = 0
+        self.seekable = hasattr(file, 'seek') and getattr(file, 'seekable', lambda: True)()
+        self.start_position = file.tell() if self.seekable else 0
+
+    def __call__(self):
+        """Upload the file and return the response of the last request, which
+        has the location of the created object.
+        """
+        chunks = self._iter_chunks()
+        chunk = next(chunks, b'')
+        attempts = 0
+        resume = False
+        while True:
+            try:
+                # Resuming is part of the attempt, the HEAD request may fail as well.
+                if resume:
+                    chunk, chunks = self._resume(chunk, chunks)
+                    resume = False
+                response = self._patch(chunk)
+            except (APIRequestException, RequestException):
+                attempts += 1
+                if attempts > self.retries:
+                    raise
+                resume = True
+                continue
+
+            attempts = 0
+            self.offset += len(chunk)
+            if self.progress is not None:
+                self.progress(self.offset, self.size)
+
+            if self.offset >= self.size:
+                return response
+
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ValueError(f'File ended after {self.offset} of {self.size} bytes.')
+
+    def _patch(self, chunk):
+        return self.session().patch(
+            self.location,
+            headers={
+                'Tus-Resumable': TUS_VERSION,
+                'Upload-Offset': str(self.offset),
+                'Content-Type': 'application/offset+octet-stream',
+            },
+            data=chunk,
+        )
+
+    def _server_offset(self):
+        response = self.session().head(self.location, headers={'Tus-Resumable': TUS_VERSION})
+        return int(response.headers['Upload-Offset'])
+
+    def _resume(self, chunk, chunks):
+        """Return the chunk to send next and the chunks iterator, continuing at the
+        offset reported by the server.
+        """
+        server_offset = self._server_offset()
+        if self.seekable:
+            self.file.seek(self.start_position + server_offset)
+            self.offset = server_offset
+            chunks = self._iter_chunks()
+            return next(chunks, b''), chunks
+
+        if not self.offset <= server_offset <= self.offset + len(chunk):
+            raise ValueError(
+                f'Cannot resume the upload at offset {server_offset}, the file is '
+                f'not seekable and at offset {self.offset}.')
+
+        chunk = chunk[server_offset - self.offset:]
+        self.offset = server_offset
+        if not chunk:
+            chunk = next(chunks, b'')
+        return chunk, chunks
+
+    def _iter_chunks(self):
+        if hasattr(self.file, 'read'):
+            while True:
+                chunk = self.file.read(self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+        buffer = bytearray()
+        for data in self.file:
+            buffer.extend(data)
+            while len(buffer) >= self.chunk_size:
+                yield bytes(buffer[:self.chunk_size])
+                del buffer[:self.chunk_size]
+        if buffer:
+            yield bytes(buffer)
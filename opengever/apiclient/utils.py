@@ -20,3 +20,16 @@ def autowrap(func):
             result = client.wrap(result)
         return result
     return wrapper
+
+
+def async_autowrap(func):
+    """Decorator for AsyncGEVERClient coroutine methods which will automatically
+    wrap returned items into API model objects.
+    """
+    @wraps(func)
+    async def wrapper(client, *args, raw=False, **kwargs):
+        result = await func(client, *args, **kwargs)
+        if not raw:
+            result = client.wrap(result)
+        return result
+    return wrapper
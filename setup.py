@@ -6,8 +6,17 @@ version = '1.0.0.dev0'
 
 
 extras_require = {
+    'async': [
+        'httpx',
+    ],
+    'speedups': [
+        'ijson',
+        'orjson',
+    ],
     'tests': [
         'freezegun',
+        'httpx',
+        'ijson',
         'pytest',
         'requests-mock',
     ],
@@ -36,6 +45,7 @@ setup(name='opengever.apiclient',
       namespace_packages=['opengever', ],
       include_package_data=True,
       zip_safe=False,
+      python_requires='>=3.7',
 
       install_requires=[
           'PyJWT [crypto]',